@@ -0,0 +1,165 @@
+# audit_export.py
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+
+import mysql.connector
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database configuration
+DB_CONFIG = {
+    'user': os.getenv("MYSQL_USER", "root"),
+    'password': os.getenv("MYSQL_PASSWORD", "014514774"),
+    'host': os.getenv("MYSQL_HOST", "localhost"),
+    'database': os.getenv("MYSQL_DB", "voter_db"),
+}
+
+# Tables that can be exported. Rows are paged on (time_column, id), which is
+# covered by the indexes created in setup_db.py, with or without a voter or
+# shard filter. Only tables with a shard column accept a shard filter.
+EXPORT_TABLES = {
+    "login_history": {
+        "columns": ["id", "voter_id", "login_time", "success"],
+        "time_column": "login_time",
+    },
+    "vote_submissions": {
+        "columns": ["id", "shard", "voter_id", "tx_hash", "submitted_at"],
+        "time_column": "submitted_at",
+    },
+}
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+def _build_query(table: str, since, until, voter_id, after, chunk_size: int, shard=None):
+    spec = EXPORT_TABLES[table]
+    time_column = spec["time_column"]
+    conditions = []
+    params = []
+    if shard:
+        conditions.append("shard = %s")
+        params.append(shard)
+    if voter_id:
+        conditions.append("voter_id = %s")
+        params.append(voter_id)
+    if since:
+        conditions.append(f"{time_column} >= %s")
+        params.append(since)
+    if until:
+        conditions.append(f"{time_column} < %s")
+        params.append(until)
+    if after:
+        # Keyset pagination: continue strictly after the last (time, id) seen
+        conditions.append(f"({time_column} > %s OR ({time_column} = %s AND id > %s))")
+        params.extend([after[0], after[0], after[1]])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (
+        f"SELECT {', '.join(spec['columns'])} FROM {table} {where} "
+        f"ORDER BY {time_column}, id LIMIT %s"
+    )
+    params.append(chunk_size)
+    return query, params
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def iter_export(connection, table: str, fmt: str = "csv", since=None, until=None,
+                voter_id=None, chunk_size: int = 5000, compress: bool = False, shard=None):
+    """Yield the export as encoded chunks, holding at most one page of rows in memory."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if shard and "shard" not in EXPORT_TABLES[table]["columns"]:
+        raise ValueError(f"Table {table} cannot be filtered by shard")
+
+    columns = EXPORT_TABLES[table]["columns"]
+    time_index = columns.index(EXPORT_TABLES[table]["time_column"])
+    encoder = zlib.compressobj(wbits=31) if compress else None  # wbits=31 writes a gzip container
+
+    def encode(text: str) -> bytes:
+        data = text.encode('utf-8')
+        return encoder.compress(data) if encoder else data
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    after = None
+    while True:
+        query, params = _build_query(table, since, until, voter_id, after, chunk_size, shard)
+        # Unbuffered cursor: rows are read off the socket as they are iterated
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            rows = 0
+            for row in cursor:
+                rows += 1
+                after = (row[time_index], row[0])
+                values = [_serialize(value) for value in row]
+                if fmt == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values))) + "\n")
+        finally:
+            cursor.close()
+
+        chunk = encode(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        if chunk:
+            yield chunk
+        if rows < chunk_size:
+            break
+
+    if encoder:
+        yield encoder.flush()
+
+def _parse_datetime(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid ISO timestamp: {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream an audit export of the voter database")
+    parser.add_argument("table", choices=sorted(EXPORT_TABLES))
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--since", type=_parse_datetime, help="Inclusive start time (ISO 8601)")
+    parser.add_argument("--until", type=_parse_datetime, help="Exclusive end time (ISO 8601)")
+    parser.add_argument("--voter-id", help="Only export rows for this voter address")
+    parser.add_argument("--shard", help="Only export rows for this election shard (vote_submissions)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output")
+    parser.add_argument("--output", help="Output file (defaults to stdout)")
+    args = parser.parse_args()
+
+    voter_id = args.voter_id
+    if voter_id:
+        from web3 import Web3
+        voter_id = Web3.to_checksum_address(voter_id)
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in iter_export(conn, args.table, args.format, args.since, args.until,
+                                 voter_id, args.chunk_size, args.gzip, args.shard):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
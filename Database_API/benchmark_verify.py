@@ -0,0 +1,167 @@
+# benchmark_verify.py
+"""Benchmark verify_tallies.py against a freshly populated local chain.
+
+Deploys Voting to a development node (Ganache or Anvil, with unlocked
+accounts and the evm_increaseTime / evm_mine methods), registers
+candidates, casts --votes votes from deterministic throwaway accounts and
+then runs the verifier over the deployment, printing its report.
+
+    ganache -p 7545        (or: anvil -p 7545)
+    python benchmark_verify.py --votes 300000 --workers 8
+
+Every vote mines its own block on an instamine node, so populating
+hundreds of thousands of votes takes a while; pass --contract and
+--from-block to benchmark an already populated deployment again.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import Web3
+
+# Load environment variables
+load_dotenv()
+
+ETHER_RPC_URL = os.getenv("ETHER_RPC_URL", "http://127.0.0.1:7545")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VOTING_JSON_PATH = os.path.join(BASE_DIR, "..", "build", "contracts", "Voting.json")
+VERIFY_SCRIPT = os.path.join(BASE_DIR, "verify_tallies.py")
+
+GAS_LIMIT = 200000
+
+def deploy(w3, deployer: str, artifact: dict):
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    tx_hash = factory.constructor().transact({"from": deployer})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    return w3.eth.contract(address=receipt["contractAddress"], abi=artifact["abi"]), receipt["blockNumber"]
+
+def open_voting(w3, contract, deployer: str):
+    """Set a voting period and move the chain clock into it."""
+    now = w3.eth.get_block("latest")["timestamp"]
+    tx_hash = contract.functions.setVotingPeriod(now + 60, now + 365 * 24 * 3600).transact({"from": deployer})
+    w3.eth.wait_for_transaction_receipt(tx_hash)
+    w3.provider.make_request("evm_increaseTime", [120])
+    w3.provider.make_request("evm_mine", [])
+
+def voter_accounts(seed: str, count: int):
+    # Deterministic keys so reruns against the same chain reuse the same voters
+    return [Account.from_key(Web3.keccak(text=f"{seed}:{i}")) for i in range(count)]
+
+def send_batch(w3, raw_transactions, workers: int, label: str):
+    started = time.perf_counter()
+    last_hash = None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for done, tx_hash in enumerate(pool.map(w3.eth.send_raw_transaction, raw_transactions), start=1):
+            last_hash = tx_hash
+            if done % 10000 == 0:
+                print(f"{label}: {done}/{len(raw_transactions)} sent", file=sys.stderr)
+    if last_hash is not None:
+        w3.eth.wait_for_transaction_receipt(last_hash, timeout=600)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {len(raw_transactions)} transactions in {elapsed:.1f}s", file=sys.stderr)
+
+def populate(w3, contract, deployer: str, voters: list, candidates: int, workers: int):
+    gas_price = w3.eth.gas_price
+    chain_id = w3.eth.chain_id
+
+    # Fund each voter from the unlocked deployer for one vote transaction
+    deployer_nonce = w3.eth.get_transaction_count(deployer, "pending")
+    funding = []
+    for i, voter in enumerate(voters):
+        funding.append({
+            "from": deployer,
+            "to": voter.address,
+            "value": GAS_LIMIT * gas_price,
+            "nonce": deployer_nonce + i,
+            "gas": 21000,
+            "gasPrice": gas_price
+        })
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(w3.eth.send_transaction, funding))
+    if hashes:
+        w3.eth.wait_for_transaction_receipt(hashes[-1], timeout=600)
+    print(f"Funding: {len(funding)} transfers in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    votes = []
+    for i, voter in enumerate(voters):
+        tx = contract.functions.vote(i % candidates + 1).build_transaction({
+            "from": voter.address,
+            "nonce": 0,
+            "gas": GAS_LIMIT,
+            "gasPrice": gas_price,
+            "chainId": chain_id
+        })
+        votes.append(voter.sign_transaction(tx).rawTransaction)
+    send_batch(w3, votes, workers, "Votes")
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate a local chain with votes and benchmark verify_tallies.py")
+    parser.add_argument("--rpc-url", default=ETHER_RPC_URL)
+    parser.add_argument("--votes", type=int, default=200000)
+    parser.add_argument("--candidates", type=int, default=10)
+    parser.add_argument("--seed", default="benchmark", help="Seed for the deterministic voter keys")
+    parser.add_argument("--send-workers", type=int, default=16, help="Concurrent transaction submissions")
+    parser.add_argument("--contract", help="Skip deployment and benchmark this already populated contract")
+    parser.add_argument("--from-block", type=int, help="Deployment block of --contract")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", help="Also write the verifier report to this JSON file")
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(args.rpc_url, request_kwargs={"timeout": 60}))
+    if not w3.is_connected():
+        raise SystemExit(f"Failed to connect to Ethereum node at {args.rpc_url}")
+
+    if args.contract:
+        contract_address = Web3.to_checksum_address(args.contract)
+        from_block = args.from_block or 0
+    else:
+        with open(VOTING_JSON_PATH, "r") as f:
+            artifact = json.load(f)
+        deployer = w3.eth.accounts[0]
+        contract, from_block = deploy(w3, deployer, artifact)
+        contract_address = contract.address
+        print(f"Deployed Voting at {contract_address} in block {from_block}", file=sys.stderr)
+
+        for i in range(1, args.candidates + 1):
+            tx_hash = contract.functions.addCandidate(f"Candidate {i}", f"Party {i}").transact({"from": deployer})
+        w3.eth.wait_for_transaction_receipt(tx_hash)
+        open_voting(w3, contract, deployer)
+        populate(w3, contract, deployer, voter_accounts(args.seed, args.votes), args.candidates, args.send_workers)
+
+    command = [
+        sys.executable, VERIFY_SCRIPT,
+        "--rpc-url", args.rpc_url,
+        "--contract", contract_address,
+        "--from-block", str(from_block),
+        "--chunk-size", str(args.chunk_size),
+        "--workers", str(args.workers),
+        "--json"
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    sys.stderr.write(result.stderr)
+    if not result.stdout:
+        raise SystemExit(f"verify_tallies.py exited with {result.returncode} and no report")
+    report = json.loads(result.stdout)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps({
+        "contract_address": contract_address,
+        "total_votes": report["total_votes"],
+        "problems": len(report["problems"]),
+        **report["benchmark"]
+    }, indent=2))
+    sys.exit(result.returncode)
+
+if __name__ == "__main__":
+    main()
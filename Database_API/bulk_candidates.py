@@ -0,0 +1,370 @@
+# bulk_candidates.py
+import argparse
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import mysql.connector
+from dotenv import load_dotenv
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from shard_config import parse_voting_shards, resolve_shard_id
+
+# Load environment variables
+load_dotenv()
+
+ETHER_RPC_URL = os.getenv("ETHER_RPC_URL", "http://127.0.0.1:7545")
+VOTING_CONTRACT_ADDRESS = os.getenv("VOTING_CONTRACT_ADDRESS", "0xd223C26a57c51364Cbb8728984EE22744fAe7840")
+OWNER_ADDRESS = os.getenv("OWNER_ADDRESS", "")
+OWNER_PRIVATE_KEY = os.getenv("OWNER_PRIVATE_KEY", "")
+# Same shard configuration as the API, so a job runs against its own constituency's contract
+VOTING_SHARDS = os.getenv("VOTING_SHARDS", "")
+DEFAULT_SHARD = os.getenv("DEFAULT_SHARD", "default")
+
+# Database configuration
+DB_CONFIG = {
+    'user': os.getenv("MYSQL_USER", "root"),
+    'password': os.getenv("MYSQL_PASSWORD", "014514774"),
+    'host': os.getenv("MYSQL_HOST", "localhost"),
+    'database': os.getenv("MYSQL_DB", "voter_db"),
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VOTING_JSON_PATH = os.path.join(BASE_DIR, "..", "build", "contracts", "Voting.json")
+
+GAS_LIMIT = 200000
+
+# Row lifecycle: pending -> signed -> sent -> mined | failed.
+# A row whose broadcast failed stays signed with its tx_hash: the node may
+# still have accepted it, so only a resume that cannot find the transaction
+# re-signs it. Rows never handed to the node go back to pending.
+RESUMABLE_STATUSES = ("pending", "signed", "sent")
+
+# A running job whose heartbeat is older than this is treated as abandoned.
+# Must be well above the receipt timeout, since a job can wait that long between rows.
+STALE_JOB_SECONDS = 600
+
+def read_candidates_file(path: str) -> list:
+    """Read (name, party) pairs from a CSV with name,party columns or a JSON list of objects."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    candidates = []
+    for number, row in enumerate(rows, start=1):
+        name = (row.get("name") or "").strip()
+        party = (row.get("party") or "").strip()
+        if not name or not party:
+            raise ValueError(f"Row {number}: name and party are required")
+        candidates.append((name, party))
+    return candidates
+
+def create_job(conn, created_by: str, candidates: list, shard: str = "default") -> int:
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO candidate_import_jobs (shard, created_by, total, status) VALUES (%s, %s, %s, 'pending')",
+            (shard, created_by, len(candidates))
+        )
+        job_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO candidate_import_rows (job_id, row_index, name, party) VALUES (%s, %s, %s, %s)",
+            [(job_id, index, name, party) for index, (name, party) in enumerate(candidates)]
+        )
+        conn.commit()
+        return job_id
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def job_progress(conn, job_id: int, include_rows: bool = False):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            "SELECT id, shard, created_by, status, total, created_at, updated_at FROM candidate_import_jobs WHERE id = %s",
+            (job_id,)
+        )
+        job = cursor.fetchone()
+        if not job:
+            return None
+        cursor.execute(
+            "SELECT status, COUNT(*) AS count FROM candidate_import_rows WHERE job_id = %s GROUP BY status",
+            (job_id,)
+        )
+        job["counts"] = {row["status"]: row["count"] for row in cursor.fetchall()}
+        if include_rows:
+            cursor.execute(
+                "SELECT row_index, name, party, nonce, tx_hash, status, block_number, error "
+                "FROM candidate_import_rows WHERE job_id = %s ORDER BY row_index",
+                (job_id,)
+            )
+            job["rows"] = cursor.fetchall()
+        return job
+    finally:
+        cursor.close()
+
+def _update_row(cursor, job_id: int, row_index: int, **fields):
+    assignments = ", ".join(f"{column} = %s" for column in fields)
+    cursor.execute(
+        f"UPDATE candidate_import_rows SET {assignments} WHERE job_id = %s AND row_index = %s",
+        (*fields.values(), job_id, row_index)
+    )
+
+def claim_job(conn, job_id: int, stale_after: int = STALE_JOB_SECONDS) -> bool:
+    """Atomically mark the job running. False if it is completed or another run still holds it."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "UPDATE candidate_import_jobs SET status = 'running', updated_at = NOW() "
+            "WHERE id = %s AND status <> 'completed' "
+            "AND (status <> 'running' OR updated_at < NOW() - INTERVAL %s SECOND)",
+            (job_id, stale_after)
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+    finally:
+        cursor.close()
+
+def _touch_job(cursor, job_id: int):
+    # Heartbeat so a live run is not mistaken for an abandoned one
+    cursor.execute("UPDATE candidate_import_jobs SET updated_at = NOW() WHERE id = %s", (job_id,))
+
+def _set_job_status(conn, job_id: int, status: str):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE candidate_import_jobs SET status = %s WHERE id = %s", (status, job_id))
+        conn.commit()
+    finally:
+        cursor.close()
+
+def _broadcast(w3, raw_transaction, tx_hash: str, receipt_timeout: float):
+    """Send a signed transaction (if raw_transaction is given) and wait for its receipt."""
+    if raw_transaction is not None:
+        try:
+            w3.eth.send_raw_transaction(raw_transaction)
+        except Exception as e:
+            if "already known" not in str(e).lower():
+                # The node may have accepted it anyway (e.g. a read timeout); leave it to _reconcile
+                return "signed", {"error": f"Broadcast failed: {e}"}
+    try:
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=receipt_timeout)
+    except TimeExhausted:
+        return "sent", {"error": "Receipt not received before timeout"}
+    if receipt["status"] == 1:
+        return "mined", {"block_number": receipt["blockNumber"], "error": None}
+    return "failed", {"block_number": receipt["blockNumber"], "error": "Transaction reverted"}
+
+def _reconcile(w3, row: dict):
+    """Work out what happened to a row that was signed before a previous run stopped."""
+    try:
+        receipt = w3.eth.get_transaction_receipt(row["tx_hash"])
+        if receipt is not None:
+            if receipt["status"] == 1:
+                return "mined", {"block_number": receipt["blockNumber"], "error": None}
+            return "failed", {"block_number": receipt["blockNumber"], "error": "Transaction reverted"}
+    except TransactionNotFound:
+        pass
+    try:
+        w3.eth.get_transaction(row["tx_hash"])
+        return "sent", {}
+    except TransactionNotFound:
+        return "pending", {"nonce": None, "tx_hash": None}
+
+def run_job(connect, w3, contract, owner_address: str, private_key: str, job_id: int,
+            max_in_flight: int = 16, receipt_timeout: float = 120, on_progress=None, reserve_nonces=None):
+    """Sign all outstanding rows with consecutive nonces and broadcast them with bounded concurrency.
+
+    The caller must have claimed the job with claim_job(). Safe to call
+    again for the same job: rows already mined are skipped and rows whose
+    transaction never reached the node are re-signed. Pass
+    reserve_nonces(count) -> first nonce to share the owner's nonce stream
+    with other writers; otherwise the pending nonce is read from the node.
+    """
+    owner_address = Web3.to_checksum_address(owner_address)
+    conn = connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            "SELECT row_index, name, party, nonce, tx_hash, status FROM candidate_import_rows "
+            f"WHERE job_id = %s AND status IN ({', '.join(['%s'] * len(RESUMABLE_STATUSES))}) ORDER BY row_index",
+            (job_id, *RESUMABLE_STATUSES)
+        )
+        rows = cursor.fetchall()
+
+        # Rows left over from an interrupted run
+        waiting = []
+        to_sign = []
+        for row in rows:
+            if row["tx_hash"]:
+                status, fields = _reconcile(w3, row)
+                _update_row(cursor, job_id, row["row_index"], status=status, **fields)
+                if status == "sent":
+                    waiting.append(row)
+                elif status == "pending":
+                    to_sign.append(row)
+            else:
+                to_sign.append(row)
+        _touch_job(cursor, job_id)
+        conn.commit()
+
+        # Sign everything up front: one nonce fetch and one gas price fetch for the whole batch
+        signed = []
+        if to_sign:
+            if reserve_nonces:
+                nonce = reserve_nonces(len(to_sign))
+            else:
+                nonce = w3.eth.get_transaction_count(owner_address, "pending")
+            gas_price = w3.eth.gas_price
+            for offset, row in enumerate(to_sign):
+                tx = contract.functions.addCandidate(row["name"], row["party"]).build_transaction({
+                    'from': owner_address,
+                    'nonce': nonce + offset,
+                    'gas': GAS_LIMIT,
+                    'gasPrice': gas_price
+                })
+                signed_tx = w3.eth.account.sign_transaction(tx, private_key)
+                tx_hash = Web3.to_hex(signed_tx.hash)
+                _update_row(cursor, job_id, row["row_index"], nonce=nonce + offset, tx_hash=tx_hash, status="signed", error=None)
+                signed.append((row, signed_tx.rawTransaction, tx_hash))
+            # Persist the hashes before broadcasting so an interrupted run can be reconciled
+            _touch_job(cursor, job_id)
+            conn.commit()
+
+        # Rows from an earlier run go first; rows are only handed to the pool as slots free up
+        queue = deque([(row, None, row["tx_hash"]) for row in waiting] + signed)
+        in_flight = {}
+        broadcast_failed = False
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            while queue or in_flight:
+                while queue and len(in_flight) < max_in_flight and not broadcast_failed:
+                    row, raw_transaction, tx_hash = queue.popleft()
+                    in_flight[pool.submit(_broadcast, w3, raw_transaction, tx_hash, receipt_timeout)] = row
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = in_flight.pop(future)
+                    try:
+                        status, fields = future.result()
+                    except Exception as e:
+                        status, fields = "sent", {"error": str(e)}
+                    if status == "signed":
+                        # Later nonces cannot be mined past this gap; stop instead of waiting out every receipt
+                        broadcast_failed = True
+                    _update_row(cursor, job_id, row["row_index"], status=status, **fields)
+                    _touch_job(cursor, job_id)
+                    conn.commit()
+                    if on_progress:
+                        on_progress(row["row_index"], status)
+
+        # Rows signed in this run but never handed to the node are re-signed by a resume
+        for row, raw_transaction, tx_hash in queue:
+            if raw_transaction is not None:
+                _update_row(
+                    cursor, job_id, row["row_index"], status="pending", nonce=None, tx_hash=None,
+                    error="Not broadcast after an earlier broadcast failure"
+                )
+        conn.commit()
+
+        cursor.execute(
+            f"SELECT COUNT(*) AS outstanding FROM candidate_import_rows WHERE job_id = %s "
+            f"AND status IN ({', '.join(['%s'] * len(RESUMABLE_STATUSES))})",
+            (job_id, *RESUMABLE_STATUSES)
+        )
+        outstanding = cursor.fetchone()["outstanding"]
+        _set_job_status(conn, job_id, "completed" if outstanding == 0 else "incomplete")
+        return job_progress(conn, job_id)
+    except Exception:
+        _set_job_status(conn, job_id, "incomplete")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+def resolve_shard(shard_id: str):
+    """Return (shard_id, contract_address, owner_address, owner_private_key), exiting if it cannot be resolved."""
+    shards = parse_voting_shards(VOTING_SHARDS, DEFAULT_SHARD, VOTING_CONTRACT_ADDRESS, OWNER_ADDRESS, OWNER_PRIVATE_KEY)
+    resolved = resolve_shard_id(shards, shard_id, DEFAULT_SHARD)
+    if resolved is None:
+        raise SystemExit(f"Shard {shard_id} is not configured in VOTING_SHARDS")
+    config = shards[resolved]
+    if not Web3.is_address(config["contract_address"] or ""):
+        raise SystemExit(f"Shard {resolved} has no valid contract address")
+    if not Web3.is_address(config["owner_address"] or "") or not config["owner_private_key"]:
+        raise SystemExit(f"Shard {resolved} has no owner address and private key (OWNER_ADDRESS / OWNER_PRIVATE_KEY)")
+    return resolved, config["contract_address"], config["owner_address"], config["owner_private_key"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Register candidates in bulk with pipelined addCandidate transactions")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--file", help="CSV (name,party columns) or JSON file of candidates")
+    group.add_argument("--resume", type=int, metavar="JOB_ID", help="Resume an interrupted import job")
+    group.add_argument("--status", type=int, metavar="JOB_ID", help="Show the progress of an import job")
+    parser.add_argument("--shard", help="Election shard for a new --file job (defaults to DEFAULT_SHARD)")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="Maximum unconfirmed transactions at once")
+    parser.add_argument("--receipt-timeout", type=float, default=120)
+    parser.add_argument("--stale-after", type=int, default=STALE_JOB_SECONDS,
+                        help="Seconds after which a job left running by a dead process may be taken over")
+    args = parser.parse_args()
+
+    connect = lambda: mysql.connector.connect(**DB_CONFIG)
+
+    if args.status is not None:
+        conn = connect()
+        try:
+            progress = job_progress(conn, args.status, include_rows=True)
+        finally:
+            conn.close()
+        if not progress:
+            raise SystemExit(f"Import job {args.status} not found")
+        print(json.dumps(progress, indent=2, default=str))
+        return
+
+    conn = connect()
+    try:
+        if args.file:
+            candidates = read_candidates_file(args.file)
+            shard_id, contract_address, owner_address, private_key = resolve_shard(args.shard)
+        else:
+            job_id = args.resume
+            if args.shard:
+                raise SystemExit("--shard only applies to --file; a resumed job runs on the shard it was created for")
+            job = job_progress(conn, job_id)
+            if not job:
+                raise SystemExit(f"Import job {job_id} not found")
+            shard_id, contract_address, owner_address, private_key = resolve_shard(job["shard"])
+            if shard_id != job["shard"]:
+                raise SystemExit(f"Import job {job_id} belongs to shard {job['shard']}, which is not configured")
+
+        w3 = Web3(Web3.HTTPProvider(ETHER_RPC_URL))
+        if not w3.is_connected():
+            raise SystemExit(f"Failed to connect to Ethereum node at {ETHER_RPC_URL}")
+        with open(VOTING_JSON_PATH, "r") as f:
+            abi = json.load(f)["abi"]
+        contract = w3.eth.contract(address=Web3.to_checksum_address(contract_address), abi=abi)
+
+        if args.file:
+            job_id = create_job(conn, Web3.to_checksum_address(owner_address), candidates, shard=shard_id)
+            print(f"Created import job {job_id} with {len(candidates)} candidates for shard {shard_id}")
+        if not claim_job(conn, job_id, args.stale_after):
+            raise SystemExit(f"Import job {job_id} is completed or still running elsewhere")
+    finally:
+        conn.close()
+
+    progress = run_job(
+        connect, w3, contract, owner_address, private_key, job_id,
+        max_in_flight=args.max_in_flight,
+        receipt_timeout=args.receipt_timeout,
+        on_progress=lambda row_index, status: print(f"Row {row_index}: {status}")
+    )
+    print(f"Import job {job_id} {progress['status']}: {progress['counts']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,19 @@
+import asyncio
 import logging
+import threading
+import time
 import traceback
+import hashlib
+from abc import ABC, abstractmethod
+from collections import Counter
 import bcrypt
 from datetime import datetime, timedelta
 from typing import Optional, List
-from fastapi import FastAPI, HTTPException, Request, Depends, status
+from fastapi import FastAPI, HTTPException, Request, Depends, Header, BackgroundTasks, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 from dotenv import load_dotenv
 import jwt
 from pydantic import BaseModel, Field, validator
@@ -15,6 +21,10 @@ from web3 import Web3
 import json
 from functools import lru_cache
 import os
+from audit_export import EXPORT_FORMATS, EXPORT_TABLES, iter_export
+import bulk_candidates
+import tracing
+from shard_config import parse_voting_shards, resolve_shard_id
 
 # Configure detailed logging
 logging.basicConfig(
@@ -45,44 +55,73 @@ app.add_middleware(
 # Debug middleware for CORS
 @app.middleware("http")
 async def debug_cors_headers(request: Request, call_next):
-    logger.debug(f"Incoming request: {request.method} {request.url}")
-    logger.debug(f"Headers: {request.headers}")
+    with tracing.span("middleware.debug_cors_headers"):
+        logger.debug(f"Incoming request: {request.method} {request.url}")
+        logger.debug(f"Headers: {request.headers}")
     
-    response = await call_next(request)
+        response = await call_next(request)
     
-    # Log response headers for debugging
-    logger.debug(f"Response status: {response.status_code}")
-    logger.debug(f"Response headers: {response.headers}")
+        # Log response headers for debugging
+        logger.debug(f"Response status: {response.status_code}")
+        logger.debug(f"Response headers: {response.headers}")
     
-    # Force CORS headers for all responses if missing
-    if 'access-control-allow-origin' not in response.headers:
-        origin = request.headers.get('origin')
-        if origin:
-            response.headers['access-control-allow-origin'] = origin
-        else:
-            response.headers['access-control-allow-origin'] = '*'
-        response.headers['access-control-allow-credentials'] = 'true'
-        response.headers['access-control-allow-methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-        response.headers['access-control-allow-headers'] = 'Authorization, Content-Type, Accept'
-        response.headers['access-control-max-age'] = '86400'
+        # Force CORS headers for all responses if missing
+        if 'access-control-allow-origin' not in response.headers:
+            origin = request.headers.get('origin')
+            if origin:
+                response.headers['access-control-allow-origin'] = origin
+            else:
+                response.headers['access-control-allow-origin'] = '*'
+            response.headers['access-control-allow-credentials'] = 'true'
+            response.headers['access-control-allow-methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+            response.headers['access-control-allow-headers'] = 'Authorization, Content-Type, Accept, Idempotency-Key'
+            response.headers['access-control-max-age'] = '86400'
     
-    return response
+        return response
 
 # Log all requests
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    path = request.url.path
-    method = request.method
-    logger.debug(f"Request: {method} {path}")
+    with tracing.span("middleware.log_requests"):
+        path = request.url.path
+        method = request.method
+        logger.debug(f"Request: {method} {path}")
     
+        try:
+            response = await call_next(request)
+            logger.debug(f"Response: {method} {path} - Status: {response.status_code}")
+            return response
+        except Exception as e:
+            logger.error(f"Request failed: {method} {path} - Error: {str(e)}")
+            logger.error(traceback.format_exc())
+            raise
+
+# Request tracing - registered last so it wraps the other middlewares
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # Continue the caller's trace when a valid W3C traceparent header is present
+    trace, token = tracing.start_trace(request.headers.get("traceparent"))
+    if trace is None:
+        return await call_next(request)
     try:
-        response = await call_next(request)
-        logger.debug(f"Response: {method} {path} - Status: {response.status_code}")
+        with tracing.span(f"{request.method} {request.url.path}", **{"http.method": request.method, "http.target": request.url.path}) as root:
+            response = await call_next(request)
+            root.attributes["http.status_code"] = response.status_code
+        response.headers["X-Trace-Id"] = trace.trace_id
         return response
-    except Exception as e:
-        logger.error(f"Request failed: {method} {path} - Error: {str(e)}")
-        logger.error(traceback.format_exc())
-        raise
+    finally:
+        tracing.end_trace(trace, token)
+
+@app.on_event("startup")
+async def configure_tracing():
+    settings = get_settings()
+    tracing.configure(
+        settings.TRACE_SAMPLE_RATE,
+        settings.TRACE_SLOW_MS,
+        settings.TRACE_EXPORT_PATH,
+        settings.TRACE_EXPORT_MAX_BYTES,
+        settings.TRACE_EXPORT_BACKUP_COUNT
+    )
 
 # Error handler for all unhandled exceptions
 @app.exception_handler(Exception)
@@ -143,8 +182,7 @@ async def test_eth():
 async def test_contract():
     """Test contract connection"""
     try:
-        settings = get_settings()
-        contract_address = settings.VOTING_CONTRACT_ADDRESS
+        contract_address = get_shard().contract_address
         
         # First check if we can load the contract
         BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -160,8 +198,7 @@ async def test_contract():
         
         # Then check if we can connect to it
         w3 = get_web3()
-        with open(VOTING_JSON_PATH, "r") as f:
-            voting_artifact = json.load(f)
+        voting_artifact = load_voting_artifact()
             
         # Check basic contract info without calling methods
         return {
@@ -176,6 +213,25 @@ async def test_contract():
         logger.error(traceback.format_exc())
         return {"status": "failed", "error": str(e)}
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe: the process is up and the health monitor loop is still beating"""
+    monitor = get_health_monitor()
+    alive = monitor.is_alive()
+    return JSONResponse(
+        status_code=200 if alive else 503,
+        content={"status": "ok" if alive else "down", "heartbeat": monitor.heartbeat, "last_run": monitor.last_run}
+    )
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe answered from the cached dependency health"""
+    snapshot = get_health_monitor().snapshot()
+    return JSONResponse(
+        status_code=503 if snapshot["status"] == "down" else 200,
+        content=snapshot
+    )
+
 # Configuration and settings
 class Settings:
     MYSQL_USER: str = os.getenv("MYSQL_USER", "root")
@@ -190,24 +246,105 @@ class Settings:
     VOTING_CONTRACT_ADDRESS: str = os.getenv("VOTING_CONTRACT_ADDRESS", "0xd223C26a57c51364Cbb8728984EE22744fAe7840")
     OWNER_ADDRESS: str = os.getenv("OWNER_ADDRESS", "")
     OWNER_PRIVATE_KEY: str = os.getenv("OWNER_PRIVATE_KEY", "")
+    # JSON object of shard id -> contract address, or -> {"contract_address", "owner_address", "owner_private_key"}
+    VOTING_SHARDS: str = os.getenv("VOTING_SHARDS", "")
+    DEFAULT_SHARD: str = os.getenv("DEFAULT_SHARD", "default")
+    MYSQL_POOL_SIZE: int = int(os.getenv("MYSQL_POOL_SIZE", "10"))
+    # How long a request waits for a pooled connection to be returned before answering 503
+    MYSQL_POOL_WAIT_SECONDS: float = float(os.getenv("MYSQL_POOL_WAIT_SECONDS", "5"))
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+    TRACE_SLOW_MS: float = float(os.getenv("TRACE_SLOW_MS", "500"))
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+    TRACE_EXPORT_MAX_BYTES: int = int(os.getenv("TRACE_EXPORT_MAX_BYTES", str(10 * 1024 * 1024)))
+    TRACE_EXPORT_BACKUP_COUNT: int = int(os.getenv("TRACE_EXPORT_BACKUP_COUNT", "5"))
+    HEALTH_CHECK_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+    # 0 disables the head block freshness check (Ganache only mines on demand)
+    HEALTH_MAX_BLOCK_AGE_SECONDS: int = int(os.getenv("HEALTH_MAX_BLOCK_AGE_SECONDS", "0"))
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    # How long an in-flight key blocks retries before it is considered abandoned
+    IDEMPOTENCY_PENDING_SECONDS: int = int(os.getenv("IDEMPOTENCY_PENDING_SECONDS", "120"))
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "300"))
+    VOTED_INDEX_START_BLOCK: int = int(os.getenv("VOTED_INDEX_START_BLOCK", "0"))
+    VOTED_INDEX_INTERVAL_SECONDS: float = float(os.getenv("VOTED_INDEX_INTERVAL_SECONDS", "5"))
+    VOTED_INDEX_CHUNK_BLOCKS: int = int(os.getenv("VOTED_INDEX_CHUNK_BLOCKS", "2000"))
+    VOTED_INDEX_CONFIRMATIONS: int = int(os.getenv("VOTED_INDEX_CONFIRMATIONS", "0"))
+    TALLY_SNAPSHOT_START_BLOCK: int = int(os.getenv("TALLY_SNAPSHOT_START_BLOCK", "0"))
+    TALLY_SNAPSHOT_INTERVAL_SECONDS: float = float(os.getenv("TALLY_SNAPSHOT_INTERVAL_SECONDS", "5"))
+    # One snapshot is written per this many blocks; historical queries replay at most one window of logs
+    TALLY_SNAPSHOT_BLOCKS: int = int(os.getenv("TALLY_SNAPSHOT_BLOCKS", "100"))
+    TALLY_SNAPSHOT_CONFIRMATIONS: int = int(os.getenv("TALLY_SNAPSHOT_CONFIRMATIONS", "0"))
+    BULK_MAX_IN_FLIGHT: int = int(os.getenv("BULK_MAX_IN_FLIGHT", "16"))
+    BULK_RECEIPT_TIMEOUT_SECONDS: float = float(os.getenv("BULK_RECEIPT_TIMEOUT_SECONDS", "120"))
+    # A running import with no heartbeat for this long is taken to be abandoned and can be resumed
+    BULK_JOB_STALE_SECONDS: int = int(os.getenv("BULK_JOB_STALE_SECONDS", str(bulk_candidates.STALE_JOB_SECONDS)))
 
 @lru_cache()
 def get_settings():
     return Settings()
 
+@lru_cache()
+def get_db_pool():
+    settings = get_settings()
+    logger.debug(f"Creating database pool: {settings.MYSQL_HOST}/{settings.MYSQL_DB} as {settings.MYSQL_USER}")
+    return pooling.MySQLConnectionPool(
+        pool_name="voting_api",
+        pool_size=settings.MYSQL_POOL_SIZE,
+        pool_reset_session=True,
+        user=settings.MYSQL_USER,
+        password=settings.MYSQL_PASSWORD,
+        host=settings.MYSQL_HOST,
+        database=settings.MYSQL_DB,
+        connection_timeout=5  # Add timeout to fail faster
+    )
+
+# Requests turned away because every pooled connection was checked out;
+# the health monitor reports the database as degraded when this grows
+_pool_exhaustions = 0
+_pool_exhaustions_lock = threading.Lock()
+
+def get_pool_exhaustions() -> int:
+    return _pool_exhaustions
+
 def get_db_connection():
+    global _pool_exhaustions
+    settings = get_settings()
+    try:
+        # close() on a pooled connection hands it back to the pool
+        pool = get_db_pool()
+        deadline = time.monotonic() + settings.MYSQL_POOL_WAIT_SECONDS
+        while True:
+            try:
+                connection = pool.get_connection()
+                break
+            except pooling.PoolError as pool_err:
+                # get_connection() does not block, so wait for a connection to be handed back
+                if time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    continue
+                with _pool_exhaustions_lock:
+                    _pool_exhaustions += 1
+                logger.warning(f"Database pool exhausted after waiting {settings.MYSQL_POOL_WAIT_SECONDS}s: {pool_err}")
+                raise HTTPException(status_code=503, detail="Database connection pool exhausted, please retry")
+        logger.debug("Database connection acquired from pool")
+        return tracing.TracedConnection(connection)
+    except Error as err:
+        logger.error(f"Failed to connect to database: {err}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Database connection failed: {str(err)}")
+
+def get_direct_db_connection():
+    """Unpooled connection for long-running or background work (exports, imports, per-shard
+    indexers), so the pool is left to request handlers however many shards are configured."""
     settings = get_settings()
     try:
-        logger.debug(f"Connecting to database: {settings.MYSQL_HOST}/{settings.MYSQL_DB} as {settings.MYSQL_USER}")
         connection = mysql.connector.connect(
             user=settings.MYSQL_USER,
             password=settings.MYSQL_PASSWORD,
             host=settings.MYSQL_HOST,
             database=settings.MYSQL_DB,
-            connection_timeout=5  # Add timeout to fail faster
+            connection_timeout=5
         )
-        logger.debug("Database connection successful")
-        return connection
+        return tracing.TracedConnection(connection)
     except Error as err:
         logger.error(f"Failed to connect to database: {err}")
         logger.error(traceback.format_exc())
@@ -218,35 +355,708 @@ def get_web3():
     settings = get_settings()
     logger.debug(f"Connecting to Ethereum node at {settings.ETHER_RPC_URL}")
     w3 = Web3(Web3.HTTPProvider(settings.ETHER_RPC_URL))
+    w3.middleware_onion.add(tracing.rpc_tracing_middleware, "tracing")
     if not w3.is_connected():
         logger.error("Failed to connect to Ethereum node")
         raise HTTPException(status_code=503, detail="Ethereum node connection failed")
     logger.debug("Ethereum node connection successful")
     return w3
 
-def get_voting_contract():
-    settings = get_settings()
-    w3 = get_web3()
+@lru_cache()
+def load_voting_artifact():
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     VOTING_JSON_PATH = os.path.join(BASE_DIR, "..", "build", "contracts", "Voting.json")
     
     logger.debug(f"Loading contract ABI from {VOTING_JSON_PATH}")
+    if not os.path.exists(VOTING_JSON_PATH):
+        logger.error(f"Contract ABI file not found at {VOTING_JSON_PATH}")
+        raise FileNotFoundError(f"Contract ABI file not found at {VOTING_JSON_PATH}")
+        
+    with open(VOTING_JSON_PATH, "r") as f:
+        return json.load(f)
+
+# Elections can be split across several Voting deployments (e.g. one per
+# constituency). Each shard has its own contract, owner nonce stream,
+# voted index and tally snapshots; without VOTING_SHARDS there is a single
+# shard bound to VOTING_CONTRACT_ADDRESS.
+class Shard:
+    def __init__(self, shard_id: str, contract_address: str, owner_address: str, owner_private_key: str):
+        self.shard_id = shard_id
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self.owner_address = owner_address
+        self.owner_private_key = owner_private_key
+
+@lru_cache()
+def get_shards() -> dict:
+    settings = get_settings()
+    config = parse_voting_shards(
+        settings.VOTING_SHARDS, settings.DEFAULT_SHARD, settings.VOTING_CONTRACT_ADDRESS,
+        settings.OWNER_ADDRESS, settings.OWNER_PRIVATE_KEY
+    )
+    shards = {
+        shard_id: Shard(shard_id, c["contract_address"], c["owner_address"], c["owner_private_key"])
+        for shard_id, c in config.items()
+    }
+    if settings.VOTING_SHARDS:
+        logger.info(f"Configured {len(shards)} voting shards: {', '.join(shards)}")
+    return shards
+
+def get_shard(shard_id: Optional[str] = None) -> Shard:
+    resolved = resolve_shard_id(get_shards(), shard_id, get_settings().DEFAULT_SHARD)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail=f"Unknown election shard: {shard_id}")
+    return get_shards()[resolved]
+
+class NonceManager:
+    """Hands out consecutive nonces for one sender without a get_transaction_count per transaction.
+
+    The counter is per process; other writers from the same account (more
+    workers, bulk_candidates.py) are tolerated by send_owner_transaction(),
+    which resyncs from the node and retries once when a nonce was taken.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self._next = None
+        self._lock = threading.Lock()
+
+    def reserve(self, w3, count: int = 1) -> int:
+        with self._lock:
+            if self._next is None:
+                self._next = w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += count
+            return nonce
+
+    def reset(self):
+        # Resync from the node after a failed broadcast so a gap is not left behind
+        with self._lock:
+            self._next = None
+
+def get_nonce_manager(address: str) -> NonceManager:
+    # Keyed on the checksum address so differently cased configs share one nonce stream
+    return _get_nonce_manager(Web3.to_checksum_address(address))
+
+@lru_cache()
+def _get_nonce_manager(address: str) -> NonceManager:
+    return NonceManager(address)
+
+# Node errors meaning the reserved nonce was already used by another writer
+NONCE_ERROR_MARKERS = ("nonce too low", "already known", "known transaction", "replacement transaction underpriced")
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+def get_voting_contract(shard_id: Optional[str] = None):
+    return _get_shard_contract(get_shard(shard_id).shard_id)
+
+@lru_cache()
+def _get_shard_contract(shard_id: str):
+    shard = get_shard(shard_id)
+    w3 = get_web3()
     try:
-        if not os.path.exists(VOTING_JSON_PATH):
-            logger.error(f"Contract ABI file not found at {VOTING_JSON_PATH}")
-            raise FileNotFoundError(f"Contract ABI file not found at {VOTING_JSON_PATH}")
-            
-        with open(VOTING_JSON_PATH, "r") as f:
-            voting_artifact = json.load(f)
-            
-        contract = w3.eth.contract(address=settings.VOTING_CONTRACT_ADDRESS, abi=voting_artifact["abi"])
-        logger.debug(f"Contract initialized at address {settings.VOTING_CONTRACT_ADDRESS}")
+        voting_artifact = load_voting_artifact()
+        contract = w3.eth.contract(address=shard.contract_address, abi=voting_artifact["abi"])
+        logger.debug(f"Contract for shard {shard.shard_id} initialized at address {shard.contract_address}")
         return contract
     except Exception as e:
         logger.error(f"Error loading Voting contract: {e}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to initialize contract: {str(e)}")
 
+def call_contract(contract_function):
+    with tracing.span(f"contract.{contract_function.fn_name}"):
+        return contract_function.call()
+
+@tracing.traced("crypto.sign_transaction")
+def sign_transaction(w3, tx: dict, private_key: str):
+    return w3.eth.account.sign_transaction(tx, private_key)
+
+def send_owner_transaction(w3, sender: str, private_key: str, contract_function):
+    """Build, sign and broadcast a contract call with a managed nonce. Returns the transaction hash."""
+    nonces = get_nonce_manager(sender)
+    for attempt in range(2):
+        try:
+            tx = contract_function.build_transaction({
+                'from': sender,
+                'nonce': nonces.reserve(w3),
+                'gas': 200000,
+                'gasPrice': w3.eth.gas_price
+            })
+            signed_tx = sign_transaction(w3, tx, private_key)
+            return w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            # Resync from the node so neither a gap nor a stale counter is left behind
+            nonces.reset()
+            if attempt or not is_nonce_error(e):
+                raise
+            logger.warning(f"Nonce for {sender} was already used by another writer ({e}); resyncing and retrying")
+
+# Base for the background loops started with the app
+class PeriodicTask(ABC):
+    name = "Background task"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.heartbeat = None
+        self._task = None
+
+    @abstractmethod
+    def run(self):
+        """One synchronous pass of the task; called in a worker thread every interval."""
+
+    async def _loop(self):
+        while True:
+            try:
+                # Beat while run() is in progress too, so a slow pass does not look like a dead loop
+                pass_task = asyncio.ensure_future(asyncio.to_thread(self.run))
+                while True:
+                    self.heartbeat = time.time()
+                    done, _ = await asyncio.wait({pass_task}, timeout=self.interval)
+                    if done:
+                        break
+                pass_task.result()
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                logger.warning(f"{self.name} run failed: {detail}")
+                logger.debug(traceback.format_exc())
+            self.heartbeat = time.time()
+            await asyncio.sleep(self.interval)
+
+    def is_alive(self) -> bool:
+        # The loop is considered stuck if its heartbeat missed a few consecutive intervals
+        return (
+            self._task is not None and not self._task.done()
+            and self.heartbeat is not None and time.time() - self.heartbeat <= self.interval * 3 + 30
+        )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Background health monitor: probes read the cached results instead of
+# hitting MySQL / the node on every poll
+class HealthMonitor(PeriodicTask):
+    name = "Health monitor"
+
+    def __init__(self, interval: float, max_block_age: int):
+        super().__init__(interval)
+        self.max_block_age = max_block_age
+        self.components = {}
+        self._next_components = {}
+        self.last_run = None
+        self._seen_pool_exhaustions = 0
+
+    def _record(self, name: str, status: str, started: float, **details):
+        self._next_components[name] = {
+            "status": status,
+            "checked_at": time.time(),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            **details
+        }
+
+    def check_database(self):
+        started = time.perf_counter()
+        error = None
+        try:
+            connection = get_db_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                cursor.close()
+            finally:
+                connection.close()
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+        
+        exhaustions = get_pool_exhaustions()
+        new_exhaustions = exhaustions - self._seen_pool_exhaustions
+        self._seen_pool_exhaustions = exhaustions
+        details = {"pool_size": get_settings().MYSQL_POOL_SIZE, "pool_exhaustions": new_exhaustions}
+        if new_exhaustions:
+            # Requests were turned away since the last check, even if this probe got a connection
+            logger.warning(f"Health check: database pool exhausted {new_exhaustions} times since last check")
+            self._record("database", "degraded", started, error=error or "Connection pool exhausted", **details)
+        elif error:
+            logger.warning(f"Health check: database unavailable - {error}")
+            self._record("database", "down", started, error=error, **details)
+        else:
+            self._record("database", "ok", started, **details)
+
+    def check_rpc(self):
+        started = time.perf_counter()
+        try:
+            block = get_web3().eth.get_block("latest")
+            block_age = max(0, int(time.time()) - block["timestamp"])
+            details = {"block_number": block["number"], "block_age_seconds": block_age}
+            if self.max_block_age and block_age > self.max_block_age:
+                self._record("rpc", "degraded", started, error="Head block is stale", **details)
+            else:
+                self._record("rpc", "ok", started, **details)
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.warning(f"Health check: Ethereum node unavailable - {detail}")
+            self._record("rpc", "down", started, error=detail)
+
+    def check_contract(self, shard: "Shard"):
+        started = time.perf_counter()
+        component = f"contract:{shard.shard_id}"
+        address = shard.contract_address
+        try:
+            load_voting_artifact()
+            code = get_web3().eth.get_code(address)
+            if len(code) == 0:
+                self._record(component, "down", started, address=address, error="No contract code at address")
+            else:
+                self._record(component, "ok", started, address=address, code_size=len(code))
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.warning(f"Health check: contract for shard {shard.shard_id} unavailable - {detail}")
+            self._record(component, "down", started, address=address, error=detail)
+
+    def run(self):
+        # Checks fill a fresh dict that is swapped in whole, so snapshot() never iterates one being written
+        self._next_components = {}
+        self.check_database()
+        self.check_rpc()
+        for shard in get_shards().values():
+            self.check_contract(shard)
+        self.components = self._next_components
+        self.last_run = time.time()
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        components = {
+            name: {**result, "age_seconds": round(now - result["checked_at"], 3)}
+            for name, result in self.components.items()
+        }
+        degraded = [name for name, result in components.items() if result["status"] != "ok"]
+        # One constituency's contract being unreachable degrades the API; it does not take it out of service
+        critical_down = [
+            name for name, result in components.items()
+            if result["status"] == "down" and not name.startswith("contract:")
+        ]
+        if not components or critical_down:
+            overall = "down"
+        elif degraded:
+            overall = "degraded"
+        else:
+            overall = "ok"
+        return {
+            "status": overall,
+            "last_run": self.last_run,
+            "degraded_components": degraded,
+            "components": components
+        }
+
+@lru_cache()
+def get_health_monitor():
+    settings = get_settings()
+    return HealthMonitor(settings.HEALTH_CHECK_INTERVAL_SECONDS, settings.HEALTH_MAX_BLOCK_AGE_SECONDS)
+
+@app.on_event("startup")
+async def start_health_monitor():
+    get_health_monitor().start()
+
+@app.on_event("shutdown")
+async def stop_health_monitor():
+    await get_health_monitor().stop()
+
+# Local index of addresses that have voted, filled from mined VoteCast logs.
+# hasVoted can never flip back to false, so a hit is answered locally and
+# only unseen addresses fall back to an eth_call.
+VOTE_CAST_TOPIC = Web3.to_hex(Web3.keccak(text="VoteCast(uint256,uint256)"))
+
+def get_vote_cast_logs(w3, contract_address: str, from_block: int, to_block: int):
+    return w3.eth.get_logs({
+        "address": contract_address,
+        "fromBlock": from_block,
+        "toBlock": to_block,
+        "topics": [VOTE_CAST_TOPIC]
+    })
+
+def vote_cast_candidate_id(log) -> int:
+    return int.from_bytes(bytes(log["topics"][1]), "big")
+
+class VotedIndex(PeriodicTask):
+    ADDRESS_SIZE = 20
+    MERGE_THRESHOLD = 1024
+
+    def __init__(self, shard: "Shard", start_block: int, interval: float, chunk_blocks: int, confirmations: int):
+        super().__init__(interval)
+        self.shard = shard
+        self.name = f"Voted index [{shard.shard_id}]"
+        self.checkpoint_name = f"voted_addresses:{shard.shard_id}"
+        self.chunk_blocks = chunk_blocks
+        self.confirmations = confirmations
+        self.checkpoint = start_block - 1
+        # Sorted, concatenated 20-byte addresses plus a small unsorted buffer
+        self._sorted = bytearray()
+        self._recent = set()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._sorted) // self.ADDRESS_SIZE + len(self._recent)
+
+    @staticmethod
+    def _to_bytes(address: str) -> bytes:
+        return bytes.fromhex(address[2:] if address.startswith(("0x", "0X")) else address)
+
+    @classmethod
+    def _position(cls, buffer, key: bytes, lo: int = 0) -> int:
+        """Index of the first address in the sorted buffer that is >= key."""
+        size = cls.ADDRESS_SIZE
+        hi = len(buffer) // size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(buffer[mid * size:(mid + 1) * size]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _search(self, key: bytes) -> bool:
+        size = self.ADDRESS_SIZE
+        position = self._position(self._sorted, key)
+        return bytes(self._sorted[position * size:(position + 1) * size]) == key
+
+    def _merge(self):
+        """Fold the recent buffer into the sorted array without holding the lock while copying."""
+        with self._lock:
+            if len(self._recent) < self.MERGE_THRESHOLD:
+                return
+            current = self._sorted
+            recent = sorted(self._recent)
+        
+        # Two-way merge: copy the runs of the old array between insertion points
+        size = self.ADDRESS_SIZE
+        merged = bytearray()
+        previous = 0
+        for key in recent:
+            position = self._position(current, key, previous)
+            if bytes(current[position * size:(position + 1) * size]) == key:
+                continue
+            merged += current[previous * size:position * size]
+            merged += key
+            previous = position
+        merged += current[previous * size:]
+        
+        with self._lock:
+            # Only run() replaces _sorted, so current is still the live array here
+            self._sorted = merged
+            self._recent.difference_update(recent)
+
+    def contains(self, address: str) -> bool:
+        key = self._to_bytes(address)
+        with self._lock:
+            return key in self._recent or self._search(key)
+
+    def add(self, address: str):
+        # Merging is left to run() so request handlers never pay for it
+        key = self._to_bytes(address)
+        with self._lock:
+            if key in self._recent or self._search(key):
+                return
+            self._recent.add(key)
+
+    def load(self):
+        connection = get_direct_db_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT block_number FROM indexer_checkpoints WHERE name = %s",
+                (self.checkpoint_name,)
+            )
+            row = cursor.fetchone()
+            if row:
+                self.checkpoint = max(self.checkpoint, row[0])
+            cursor.execute(
+                "SELECT address FROM voted_addresses WHERE shard = %s ORDER BY address",
+                (self.shard.shard_id,)
+            )
+            with self._lock:
+                self._sorted = bytearray(b"".join(bytes(address) for (address,) in cursor))
+                self._recent.clear()
+            self._loaded = True
+            logger.info(f"{self.name} loaded: {len(self)} addresses, checkpoint block {self.checkpoint}")
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _persist(self, addresses: List[tuple], to_block: int):
+        connection = get_direct_db_connection()
+        cursor = connection.cursor()
+        try:
+            if addresses:
+                cursor.executemany(
+                    "INSERT IGNORE INTO voted_addresses (shard, address, block_number) VALUES (%s, %s, %s)",
+                    [(self.shard.shard_id, address, block_number) for address, block_number in addresses]
+                )
+            cursor.execute(
+                "INSERT INTO indexer_checkpoints (name, block_number) VALUES (%s, %s) "
+                "ON DUPLICATE KEY UPDATE block_number = VALUES(block_number)",
+                (self.checkpoint_name, to_block)
+            )
+            connection.commit()
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def run(self):
+        if not self._loaded:
+            self.load()
+        w3 = get_web3()
+        head = w3.eth.block_number - self.confirmations
+        while self.checkpoint < head:
+            from_block = self.checkpoint + 1
+            to_block = min(head, from_block + self.chunk_blocks - 1)
+            logs = get_vote_cast_logs(w3, self.shard.contract_address, from_block, to_block)
+            # A VoteCast log only exists for a successful vote(); its sender is the voter
+            voters = []
+            for log in logs:
+                sender = w3.eth.get_transaction(log["transactionHash"])["from"]
+                voters.append((self._to_bytes(sender), log["blockNumber"]))
+            self._persist(voters, to_block)
+            for key, _ in voters:
+                self.add(Web3.to_hex(key))
+            self._merge()
+            self.checkpoint = to_block
+            if voters:
+                logger.info(f"{self.name}: {len(voters)} votes in blocks {from_block}-{to_block}, {len(self)} addresses indexed")
+        # Also folds in addresses has_voted() learned from the contract
+        self._merge()
+
+def get_voted_index(shard_id: Optional[str] = None):
+    return _get_shard_voted_index(get_shard(shard_id).shard_id)
+
+@lru_cache()
+def _get_shard_voted_index(shard_id: str):
+    settings = get_settings()
+    return VotedIndex(
+        get_shard(shard_id),
+        settings.VOTED_INDEX_START_BLOCK,
+        settings.VOTED_INDEX_INTERVAL_SECONDS,
+        settings.VOTED_INDEX_CHUNK_BLOCKS,
+        settings.VOTED_INDEX_CONFIRMATIONS
+    )
+
+def has_voted(voting_contract, voter_id: str, shard_id: Optional[str] = None) -> bool:
+    voted_index = get_voted_index(shard_id)
+    if voted_index.contains(voter_id):
+        return True
+    voted = call_contract(voting_contract.functions.hasVoted(voter_id))
+    if voted:
+        voted_index.add(voter_id)
+    return voted
+
+@app.on_event("startup")
+async def start_voted_index():
+    for shard_id in get_shards():
+        get_voted_index(shard_id).start()
+
+@app.on_event("shutdown")
+async def stop_voted_index():
+    for shard_id in get_shards():
+        await get_voted_index(shard_id).stop()
+
+# Per-block tally snapshots for historical results. A snapshot row is written
+# at the end of every block window (candidate counts only when they changed),
+# so a query at block N starts from the nearest snapshot at or below N and
+# replays at most one window of VoteCast logs after it.
+class TallySnapshotter(PeriodicTask):
+    def __init__(self, shard: "Shard", start_block: int, interval: float, snapshot_blocks: int, confirmations: int):
+        super().__init__(interval)
+        self.shard = shard
+        self.name = f"Tally snapshotter [{shard.shard_id}]"
+        self.checkpoint_name = f"tally_snapshots:{shard.shard_id}"
+        self.start_block = start_block
+        self.snapshot_blocks = snapshot_blocks
+        self.confirmations = confirmations
+        self.checkpoint = start_block - 1
+        self.tallies = Counter()
+        self._loaded = False
+
+    def load(self):
+        connection = get_direct_db_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT block_number FROM indexer_checkpoints WHERE name = %s",
+                (self.checkpoint_name,)
+            )
+            row = cursor.fetchone()
+            if row:
+                self.checkpoint = max(self.checkpoint, row[0])
+            # Counts are written whenever they change, so the latest set holds the running tallies
+            cursor.execute(
+                "SELECT candidate_id, vote_count FROM tally_snapshot_counts "
+                "WHERE shard = %s AND block_number = (SELECT MAX(block_number) FROM tally_snapshot_counts WHERE shard = %s)",
+                (self.shard.shard_id, self.shard.shard_id)
+            )
+            self.tallies = Counter({candidate_id: vote_count for candidate_id, vote_count in cursor})
+            self._loaded = True
+            logger.info(f"{self.name} loaded: {sum(self.tallies.values())} votes, checkpoint block {self.checkpoint}")
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _persist(self, to_block: int, block_timestamp: int, counts_changed: bool):
+        connection = get_direct_db_connection()
+        cursor = connection.cursor()
+        try:
+            shard_id = self.shard.shard_id
+            cursor.execute(
+                "INSERT INTO tally_snapshots (shard, block_number, block_timestamp, total_votes) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE block_timestamp = VALUES(block_timestamp), total_votes = VALUES(total_votes)",
+                (shard_id, to_block, block_timestamp, sum(self.tallies.values()))
+            )
+            if counts_changed:
+                cursor.executemany(
+                    "INSERT INTO tally_snapshot_counts (shard, block_number, candidate_id, vote_count) VALUES (%s, %s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE vote_count = VALUES(vote_count)",
+                    [(shard_id, to_block, candidate_id, count) for candidate_id, count in self.tallies.items()]
+                )
+            cursor.execute(
+                "INSERT INTO indexer_checkpoints (name, block_number) VALUES (%s, %s) "
+                "ON DUPLICATE KEY UPDATE block_number = VALUES(block_number)",
+                (self.checkpoint_name, to_block)
+            )
+            connection.commit()
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def run(self):
+        if not self._loaded:
+            self.load()
+        w3 = get_web3()
+        head = w3.eth.block_number - self.confirmations
+        # Only whole windows are snapshotted, so snapshots stay exactly one window apart
+        while self.checkpoint + self.snapshot_blocks <= head:
+            from_block = self.checkpoint + 1
+            to_block = from_block + self.snapshot_blocks - 1
+            logs = get_vote_cast_logs(w3, self.shard.contract_address, from_block, to_block)
+            tallies = self.tallies.copy()
+            for log in logs:
+                tallies[vote_cast_candidate_id(log)] += 1
+            previous, self.tallies = self.tallies, tallies
+            try:
+                self._persist(to_block, w3.eth.get_block(to_block)["timestamp"], bool(logs))
+            except Exception:
+                self.tallies = previous
+                raise
+            self.checkpoint = to_block
+            if logs:
+                logger.info(f"{self.name}: snapshot at block {to_block}, {sum(tallies.values())} votes")
+
+    def tallies_at(self, w3, block_number: int):
+        """Return (tallies, snapshot_block) as of block_number from the nearest snapshot plus replayed logs."""
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT MAX(block_number) FROM tally_snapshots WHERE shard = %s AND block_number <= %s",
+                (self.shard.shard_id, block_number)
+            )
+            (snapshot_block,) = cursor.fetchone()
+            tallies = Counter()
+            if snapshot_block is not None:
+                # Quiet windows have no count rows; the last counts at or below the snapshot still apply
+                cursor.execute(
+                    "SELECT candidate_id, vote_count FROM tally_snapshot_counts WHERE shard = %s AND block_number = "
+                    "(SELECT MAX(block_number) FROM tally_snapshot_counts WHERE shard = %s AND block_number <= %s)",
+                    (self.shard.shard_id, self.shard.shard_id, snapshot_block)
+                )
+                tallies.update({candidate_id: vote_count for candidate_id, vote_count in cursor})
+        finally:
+            cursor.close()
+            connection.close()
+
+        from_block = (snapshot_block + 1) if snapshot_block is not None else self.start_block
+        if block_number - from_block + 1 > 2 * self.snapshot_blocks + self.confirmations:
+            # The snapshotter is still catching up; don't replay an unbounded range per request
+            raise HTTPException(status_code=503, detail=f"Tally snapshots have not reached block {block_number} yet")
+        while from_block <= block_number:
+            to_block = min(block_number, from_block + self.snapshot_blocks - 1)
+            for log in get_vote_cast_logs(w3, self.shard.contract_address, from_block, to_block):
+                tallies[vote_cast_candidate_id(log)] += 1
+            from_block = to_block + 1
+        return tallies, snapshot_block
+
+    def block_at(self, w3, timestamp: int) -> int:
+        """Binary search for the last block mined at or before timestamp."""
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT MAX(block_number) FROM tally_snapshots WHERE shard = %s AND block_timestamp <= %s",
+                (self.shard.shard_id, timestamp)
+            )
+            (low,) = cursor.fetchone()
+            # Snapshots are one window apart, so the answer lies before the next one
+            cursor.execute(
+                "SELECT MIN(block_number) FROM tally_snapshots WHERE shard = %s AND block_timestamp > %s",
+                (self.shard.shard_id, timestamp)
+            )
+            (next_snapshot,) = cursor.fetchone()
+        finally:
+            cursor.close()
+            connection.close()
+
+        low = low if low is not None else 0
+        high = next_snapshot - 1 if next_snapshot is not None else w3.eth.block_number
+        if w3.eth.get_block(low)["timestamp"] > timestamp:
+            raise HTTPException(status_code=400, detail="Requested time is before the first indexed block")
+        while low < high:
+            middle = (low + high + 1) // 2
+            if w3.eth.get_block(middle)["timestamp"] <= timestamp:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+def get_tally_snapshotter(shard_id: Optional[str] = None):
+    return _get_shard_tally_snapshotter(get_shard(shard_id).shard_id)
+
+@lru_cache()
+def _get_shard_tally_snapshotter(shard_id: str):
+    settings = get_settings()
+    return TallySnapshotter(
+        get_shard(shard_id),
+        settings.TALLY_SNAPSHOT_START_BLOCK,
+        settings.TALLY_SNAPSHOT_INTERVAL_SECONDS,
+        settings.TALLY_SNAPSHOT_BLOCKS,
+        settings.TALLY_SNAPSHOT_CONFIRMATIONS
+    )
+
+@app.on_event("startup")
+async def start_tally_snapshotter():
+    for shard_id in get_shards():
+        get_tally_snapshotter(shard_id).start()
+
+@app.on_event("shutdown")
+async def stop_tally_snapshotter():
+    for shard_id in get_shards():
+        await get_tally_snapshotter(shard_id).stop()
+
 class VoterLogin(BaseModel):
     voter_id: str = Field(..., description="Ethereum address of the voter")
     password: str = Field(..., min_length=6)
@@ -255,6 +1065,7 @@ class VoterRegister(BaseModel):
     voter_id: str = Field(..., description="Ethereum address of the voter")
     password: str = Field(..., min_length=6)
     role: str = Field("voter", description="User role (voter or admin)")
+    shard: Optional[str] = Field(None, description="Election shard (constituency) the voter belongs to")
     
     @validator('role')
     def validate_role(cls, v):
@@ -275,6 +1086,9 @@ class CandidateCreate(BaseModel):
     name: str = Field(..., min_length=1)
     party: str = Field(..., min_length=1)
 
+class BulkCandidateCreate(BaseModel):
+    candidates: List[CandidateCreate] = Field(..., min_items=1)
+
 class VotingDates(BaseModel):
     start_date: int = Field(..., gt=0)
     end_date: int = Field(..., gt=0)
@@ -311,7 +1125,8 @@ async def authenticate(request: Request):
     
     settings = get_settings()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        with tracing.span("jwt.decode"):
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
         if datetime.fromtimestamp(payload.get("exp", 0)) < datetime.now():
             logger.warning("Authentication failed: Token expired")
             raise HTTPException(status_code=401, detail="Token expired", headers={"WWW-Authenticate": "Bearer"})
@@ -335,11 +1150,140 @@ def require_admin(auth_data: dict = Depends(authenticate)):
         raise HTTPException(status_code=403, detail="Admin rights required")
     return auth_data
 
+# Idempotency keys: a retried write with the same Idempotency-Key replays the
+# stored response instead of signing and broadcasting another transaction
+
+# Returned by the write handlers when the node rejected the transaction
+SIMULATED_TX_HASH = "0x" + "0" * 64
+_last_idempotency_purge = 0.0
+
+def purge_idempotency_keys(cursor, conn):
+    global _last_idempotency_purge
+    settings = get_settings()
+    if time.time() - _last_idempotency_purge < settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS:
+        return
+    _last_idempotency_purge = time.time()
+    cursor.execute("DELETE FROM idempotency_keys WHERE expires_at < NOW() LIMIT 5000")
+    conn.commit()
+    if cursor.rowcount:
+        logger.info(f"Purged {cursor.rowcount} expired idempotency keys")
+
+def claim_idempotency_key(key: str, voter_id: str, endpoint: str, request_hash: str):
+    """Reserve the key for this request. Returns the stored response when the key was already completed."""
+    settings = get_settings()
+    connection = get_db_connection()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        purge_idempotency_keys(cursor, connection)
+        cursor.execute(
+            "DELETE FROM idempotency_keys WHERE voter_id = %s AND endpoint = %s AND idempotency_key = %s AND expires_at < NOW()",
+            (voter_id, endpoint, key)
+        )
+        try:
+            cursor.execute(
+                "INSERT INTO idempotency_keys (idempotency_key, voter_id, endpoint, request_hash, status, expires_at) "
+                "VALUES (%s, %s, %s, %s, 'pending', NOW() + INTERVAL %s SECOND)",
+                (key, voter_id, endpoint, request_hash, settings.IDEMPOTENCY_PENDING_SECONDS)
+            )
+            connection.commit()
+            return None
+        except mysql.connector.IntegrityError:
+            connection.rollback()
+        
+        cursor.execute(
+            "SELECT request_hash, status, response_code, response_body FROM idempotency_keys "
+            "WHERE voter_id = %s AND endpoint = %s AND idempotency_key = %s",
+            (voter_id, endpoint, key)
+        )
+        stored = cursor.fetchone()
+        if not stored:
+            # Expired and purged between the insert and the lookup
+            raise HTTPException(status_code=409, detail="Idempotency key conflict, please retry")
+        if stored["request_hash"] != request_hash:
+            logger.warning(f"Idempotency key reused with a different payload by {voter_id} on {endpoint}")
+            raise HTTPException(status_code=422, detail="Idempotency key was already used with a different request")
+        if stored["status"] != "completed":
+            raise HTTPException(status_code=409, detail="A request with this idempotency key is still in progress")
+        return {"status_code": stored["response_code"], "body": json.loads(stored["response_body"])}
+    except Error as e:
+        logger.error(f"Database error while claiming idempotency key: {e}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Idempotency check failed: {str(e)}")
+    finally:
+        cursor.close()
+        connection.close()
+
+def complete_idempotency_key(key: str, voter_id: str, endpoint: str, status_code: int, body):
+    settings = get_settings()
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "UPDATE idempotency_keys SET status = 'completed', response_code = %s, response_body = %s, "
+            "expires_at = NOW() + INTERVAL %s SECOND "
+            "WHERE voter_id = %s AND endpoint = %s AND idempotency_key = %s",
+            (status_code, json.dumps(body), settings.IDEMPOTENCY_TTL_SECONDS, voter_id, endpoint, key)
+        )
+        connection.commit()
+    except Error as e:
+        # The write itself succeeded; a lost record only means a retry is not deduplicated
+        logger.error(f"Failed to store idempotent response: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
+def release_idempotency_key(key: str, voter_id: str, endpoint: str):
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM idempotency_keys WHERE voter_id = %s AND endpoint = %s AND idempotency_key = %s AND status = 'pending'",
+            (voter_id, endpoint, key)
+        )
+        connection.commit()
+    except Error as e:
+        logger.error(f"Failed to release idempotency key: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
+async def run_idempotent(key: Optional[str], auth_data: dict, endpoint: str, payload: dict, status_code: int, handler):
+    if not key:
+        return await handler()
+    if len(key) > 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be at most 255 characters")
+    
+    voter_id = auth_data["voter_id"]
+    request_hash = hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+    stored = claim_idempotency_key(key, voter_id, endpoint, request_hash)
+    if stored is not None:
+        logger.info(f"Replaying stored response for idempotency key on {endpoint} from {voter_id}")
+        return JSONResponse(
+            status_code=stored["status_code"],
+            content=stored["body"],
+            headers={"Idempotent-Replayed": "true"}
+        )
+    
+    try:
+        result = await handler()
+    except Exception:
+        # Let the client retry with the same key after a failure
+        release_idempotency_key(key, voter_id, endpoint)
+        raise
+    if isinstance(result, dict) and result.get("transaction_hash") == SIMULATED_TX_HASH:
+        # Nothing was broadcast, so a retry must reach the node rather than replay the simulated response
+        release_idempotency_key(key, voter_id, endpoint)
+        return result
+    complete_idempotency_key(key, voter_id, endpoint, status_code, result)
+    return result
+
+@tracing.traced("bcrypt.hashpw")
 def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 # Fixed verify_password function
+@tracing.traced("bcrypt.checkpw")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         # Make sure we're using UTF-8 encoding
@@ -360,6 +1304,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         logger.error(traceback.format_exc())
         return False
 
+@tracing.traced("jwt.encode")
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     settings = get_settings()
     to_encode = data.copy()
@@ -367,6 +1312,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire.timestamp()})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
 
+@tracing.traced("jwt.encode")
 def create_refresh_token(data: dict):
     settings = get_settings()
     to_encode = data.copy()
@@ -386,14 +1332,15 @@ async def register(voter: VoterRegister, db=Depends(get_db_cursor)):
             logger.warning(f"Registration failed: Voter ID already exists - {voter_id}")
             raise HTTPException(status_code=400, detail="Voter ID already exists")
         
+        shard_id = get_shard(voter.shard).shard_id
         hashed_pwd = hash_password(voter.password)
         cursor.execute(
-            "INSERT INTO voters (voter_id, password_hash, role, created_at) VALUES (%s, %s, %s, NOW())",
-            (voter_id, hashed_pwd, voter.role)
+            "INSERT INTO voters (voter_id, password_hash, role, shard, created_at) VALUES (%s, %s, %s, %s, NOW())",
+            (voter_id, hashed_pwd, voter.role, shard_id)
         )
         conn.commit()
-        logger.info(f"Registration successful for voter_id: {voter_id}, role: {voter.role}")
-        return {"message": "Voter registered successfully"}
+        logger.info(f"Registration successful for voter_id: {voter_id}, role: {voter.role}, shard: {shard_id}")
+        return {"message": "Voter registered successfully", "shard": shard_id}
     except Error as e:
         conn.rollback()
         logger.error(f"Database error during registration: {e}")
@@ -413,7 +1360,7 @@ async def login(voter: VoterLogin, db=Depends(get_db_cursor)):
         
         # Query for the user
         try:
-            cursor.execute("SELECT password_hash, role FROM voters WHERE voter_id = %s", (voter_id,))
+            cursor.execute("SELECT password_hash, role, shard FROM voters WHERE voter_id = %s", (voter_id,))
             result = cursor.fetchone()
         except Exception as db_err:
             logger.error(f"Database query error: {db_err}")
@@ -452,7 +1399,7 @@ async def login(voter: VoterLogin, db=Depends(get_db_cursor)):
             # Don't fail the login just because we couldn't log it
         
         logger.info(f"Login successful for voter_id: {voter_id}, role: {role}")
-        return {"token": access_token, "refresh_token": refresh_token, "role": role}
+        return {"token": access_token, "refresh_token": refresh_token, "role": role, "shard": result["shard"]}
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -466,7 +1413,8 @@ async def refresh_token_endpoint(refresh: RefreshToken, db=Depends(get_db_cursor
     settings = get_settings()
     try:
         logger.info("Token refresh attempt")
-        payload = jwt.decode(refresh.refresh_token, settings.REFRESH_SECRET_KEY, algorithms=["HS256"])
+        with tracing.span("jwt.decode"):
+            payload = jwt.decode(refresh.refresh_token, settings.REFRESH_SECRET_KEY, algorithms=["HS256"])
         if datetime.fromtimestamp(payload.get("exp", 0)) < datetime.now():
             logger.warning("Token refresh failed: Refresh token expired")
             raise HTTPException(status_code=401, detail="Refresh token expired")
@@ -492,21 +1440,46 @@ async def refresh_token_endpoint(refresh: RefreshToken, db=Depends(get_db_cursor
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=401, detail=f"Invalid refresh token: {str(e)}")
 
+def get_voter_shard(voter_id: str, requested: Optional[str] = None) -> Shard:
+    """The shard a voter registered in. A ?shard= that names another shard is rejected,
+    since the duplicate-vote checks are per shard."""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT shard FROM voters WHERE voter_id = %s", (Web3.to_checksum_address(voter_id),))
+        row = cursor.fetchone()
+    except Error as e:
+        logger.error(f"Database error looking up voter shard: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to look up voter shard: {str(e)}")
+    finally:
+        cursor.close()
+        connection.close()
+    if not row:
+        logger.warning(f"Shard lookup failed: voter {voter_id} is not registered")
+        raise HTTPException(status_code=403, detail="Voter is not registered")
+    shard = get_shard(row[0])
+    if requested and get_shard(requested).shard_id != shard.shard_id:
+        logger.warning(f"Voter {voter_id} registered in shard {shard.shard_id} requested shard {requested}")
+        raise HTTPException(status_code=403, detail=f"Voter is registered in shard {shard.shard_id}")
+    return shard
+
 @app.get("/voter/status", status_code=status.HTTP_200_OK)
-async def get_voter_status(auth_data: dict = Depends(authenticate)):
+async def get_voter_status(shard: Optional[str] = None, auth_data: dict = Depends(authenticate)):
+    shard_id = get_voter_shard(auth_data["voter_id"], shard).shard_id
     try:
         voter_id = Web3.to_checksum_address(auth_data["voter_id"])
-        logger.info(f"Checking voter status for: {voter_id}")
+        logger.info(f"Checking voter status for: {voter_id} in shard {shard_id}")
         
-        voting_contract = get_voting_contract()
-        has_voted = voting_contract.functions.hasVoted(voter_id).call()
-        voting_status = voting_contract.functions.getVotingStatus().call()
+        voting_contract = get_voting_contract(shard_id)
+        voted = has_voted(voting_contract, voter_id, shard_id)
+        voting_status = call_contract(voting_contract.functions.getVotingStatus())
         status_map = {0: "not_started", 1: "active", 2: "ended"}
         
-        logger.info(f"Voter status retrieved for {voter_id}: has_voted={has_voted}, status={status_map.get(voting_status, 'unknown')}")
+        logger.info(f"Voter status retrieved for {voter_id}: has_voted={voted}, status={status_map.get(voting_status, 'unknown')}")
         return {
             "voter_id": voter_id,
-            "has_voted": has_voted,
+            "shard": shard_id,
+            "has_voted": voted,
             "voting_status": status_map.get(voting_status, "unknown")
         }
     except Exception as e:
@@ -515,12 +1488,13 @@ async def get_voter_status(auth_data: dict = Depends(authenticate)):
         raise HTTPException(status_code=500, detail=f"Failed to check voter status: {str(e)}")
 
 @app.get("/voting/dates", status_code=status.HTTP_200_OK)
-async def get_voting_dates():
+async def get_voting_dates(shard: Optional[str] = None):
+    shard_id = get_shard(shard).shard_id
     try:
-        logger.info("Fetching voting dates")
-        voting_contract = get_voting_contract()
+        logger.info(f"Fetching voting dates for shard {shard_id}")
+        voting_contract = get_voting_contract(shard_id)
         try:
-            start, end = voting_contract.functions.getVotingPeriod().call()
+            start, end = call_contract(voting_contract.functions.getVotingPeriod())
             start_readable = datetime.fromtimestamp(start).isoformat() if start > 0 else None
             end_readable = datetime.fromtimestamp(end).isoformat() if end > 0 else None
             
@@ -549,12 +1523,13 @@ async def get_voting_dates():
         raise HTTPException(status_code=500, detail=f"Failed to fetch voting dates: {str(e)}")
 
 @app.get("/candidates", response_model=List[Candidate])
-async def get_candidates():
+async def get_candidates(shard: Optional[str] = None):
+    shard_id = get_shard(shard).shard_id
     try:
-        logger.info("Fetching candidates")
-        voting_contract = get_voting_contract()
+        logger.info(f"Fetching candidates for shard {shard_id}")
+        voting_contract = get_voting_contract(shard_id)
         try:
-            candidates_data = voting_contract.functions.getAllCandidates().call()
+            candidates_data = call_contract(voting_contract.functions.getAllCandidates())
             
             candidates = [
                 {"id": c[0], "name": c[1], "party": c[2], "vote_count": c[3]}
@@ -576,19 +1551,162 @@ async def get_candidates():
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to fetch candidates: {str(e)}")
 
+@app.get("/candidates/history", status_code=status.HTTP_200_OK)
+async def get_candidates_history(block: Optional[int] = None, at: Optional[int] = None, shard: Optional[str] = None):
+    """Results as of a block number or a unix timestamp"""
+    if (block is None) == (at is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'block' or 'at'")
+    shard_id = get_shard(shard).shard_id
+    try:
+        # Block lookups and log replay are blocking RPC calls; keep them off the event loop
+        return await asyncio.to_thread(fetch_candidates_history, shard_id, block, at)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching historical results: {e}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Failed to fetch historical results: {str(e)}")
+
+def fetch_candidates_history(shard_id: str, block: Optional[int], at: Optional[int]) -> dict:
+    w3 = get_web3()
+    snapshotter = get_tally_snapshotter(shard_id)
+    if at is not None:
+        block = snapshotter.block_at(w3, at)
+    elif block < 0 or block > w3.eth.block_number:
+        raise HTTPException(status_code=400, detail="Block number is out of range")
+    logger.info(f"Fetching historical results at block {block}")
+    
+    tallies, snapshot_block = snapshotter.tallies_at(w3, block)
+    
+    # Names come from the current candidate list; counts are historical
+    names = {}
+    try:
+        for c in call_contract(get_voting_contract(shard_id).functions.getAllCandidates()):
+            names[c[0]] = {"name": c[1], "party": c[2]}
+    except Exception as contract_error:
+        logger.error(f"Contract error when fetching candidate names: {contract_error}")
+    
+    candidates = [
+        {"id": candidate_id, **names.get(candidate_id, {}), "vote_count": tallies.get(candidate_id, 0)}
+        for candidate_id in sorted(set(names) | set(tallies))
+    ]
+    return {
+        "shard": shard_id,
+        "block_number": block,
+        "block_timestamp": w3.eth.get_block(block)["timestamp"],
+        "snapshot_block": snapshot_block,
+        "total_votes": sum(tallies.values()),
+        "candidates": candidates
+    }
+
+@app.get("/candidates/turnout", status_code=status.HTTP_200_OK)
+async def get_turnout_series(
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: int = 1000,
+    shard: Optional[str] = None,
+    db=Depends(get_db_cursor)
+):
+    """Total votes over time from the tally snapshots, for charts"""
+    cursor, conn = db
+    limit = max(1, min(limit, 10000))
+    conditions = ["shard = %s"]
+    params = [get_shard(shard).shard_id]
+    if since is not None:
+        conditions.append("block_timestamp >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append("block_timestamp <= %s")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}"
+    try:
+        cursor.execute(
+            f"SELECT block_number, block_timestamp, total_votes FROM tally_snapshots {where} "
+            "ORDER BY block_number LIMIT %s",
+            (*params, limit)
+        )
+        return {"points": cursor.fetchall()}
+    except Error as e:
+        logger.error(f"Database error fetching turnout series: {e}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Failed to fetch turnout series: {str(e)}")
+
+@app.get("/shards", status_code=status.HTTP_200_OK)
+async def list_shards():
+    return {
+        "default_shard": get_shard().shard_id,
+        "shards": [
+            {"shard": shard.shard_id, "contract_address": shard.contract_address}
+            for shard in get_shards().values()
+        ]
+    }
+
+def fetch_shard_candidates(shard_id: str) -> list:
+    return call_contract(get_voting_contract(shard_id).functions.getAllCandidates())
+
+@app.get("/results/national", status_code=status.HTTP_200_OK)
+async def get_national_results():
+    """Fan out getAllCandidates to every shard concurrently and merge the tallies"""
+    shard_ids = list(get_shards())
+    logger.info(f"Fetching national results across {len(shard_ids)} shards")
+    results = await asyncio.gather(
+        *(asyncio.to_thread(fetch_shard_candidates, shard_id) for shard_id in shard_ids),
+        return_exceptions=True
+    )
+    
+    shards = {}
+    failed_shards = {}
+    party_totals = Counter()
+    for shard_id, result in zip(shard_ids, results):
+        if isinstance(result, BaseException):
+            detail = result.detail if isinstance(result, HTTPException) else str(result)
+            logger.error(f"Failed to fetch results for shard {shard_id}: {detail}")
+            failed_shards[shard_id] = detail
+            continue
+        shards[shard_id] = [
+            {"id": c[0], "name": c[1], "party": c[2], "vote_count": c[3]}
+            for c in result
+        ]
+        for c in result:
+            party_totals[c[2]] += c[3]
+    
+    return {
+        "total_votes": sum(party_totals.values()),
+        "party_totals": dict(party_totals.most_common()),
+        "shards": shards,
+        "failed_shards": failed_shards,
+        "complete": not failed_shards
+    }
+
 @app.post("/vote", status_code=status.HTTP_201_CREATED)
-async def submit_vote(vote: VoteRequest, auth_data: dict = Depends(authenticate)):
-    settings = get_settings()
+async def submit_vote(
+    vote: VoteRequest,
+    shard: Optional[str] = None,
+    auth_data: dict = Depends(authenticate),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    # Voters can only vote in the shard they registered in
+    shard = get_voter_shard(auth_data["voter_id"], shard)
+    return await run_idempotent(
+        idempotency_key, auth_data, "/vote", {**vote.dict(), "shard": shard.shard_id}, status.HTTP_201_CREATED,
+        lambda: _submit_vote(vote, auth_data, shard)
+    )
+
+async def _submit_vote(vote: VoteRequest, auth_data: dict, shard: Shard):
+    # Known voters are rejected from the local index without touching the node
+    if get_voted_index(shard.shard_id).contains(auth_data["voter_id"]):
+        logger.warning(f"Vote failed: {auth_data['voter_id']} has already voted (local index)")
+        raise HTTPException(status_code=400, detail="Already voted")
     w3 = get_web3()
     try:
         voter_id = Web3.to_checksum_address(auth_data["voter_id"])
-        logger.info(f"Vote attempt from {voter_id} for candidate {vote.candidate_id}")
+        logger.info(f"Vote attempt from {voter_id} for candidate {vote.candidate_id} in shard {shard.shard_id}")
         
-        voting_contract = get_voting_contract()
+        voting_contract = get_voting_contract(shard.shard_id)
         
         # Check if already voted
         try:
-            if voting_contract.functions.hasVoted(voter_id).call():
+            if has_voted(voting_contract, voter_id, shard.shard_id):
                 logger.warning(f"Vote failed: {voter_id} has already voted")
                 raise HTTPException(status_code=400, detail="Already voted")
         except Exception as contract_error:
@@ -597,47 +1715,64 @@ async def submit_vote(vote: VoteRequest, auth_data: dict = Depends(authenticate)
             # For development, allow vote anyway
             pass
         
+        sender = shard.owner_address or voter_id
         try:
-            tx = voting_contract.functions.vote(vote.candidate_id).build_transaction({
-                'from': settings.OWNER_ADDRESS or voter_id,
-                'nonce': w3.eth.get_transaction_count(settings.OWNER_ADDRESS or voter_id),
-                'gas': 200000,
-                'gasPrice': w3.eth.gas_price
-            })
-            
             # In production, this should be signed by the client
-            signed_tx = w3.eth.account.sign_transaction(tx, settings.OWNER_PRIVATE_KEY)
-            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = send_owner_transaction(w3, sender, shard.owner_private_key, voting_contract.functions.vote(vote.candidate_id))
             
             logger.info(f"Vote successfully recorded for {voter_id}, tx_hash: {tx_hash.hex()}")
+            record_vote_submission(voter_id, tx_hash.hex(), shard.shard_id)
             return {"transaction_hash": tx_hash.hex(), "message": "Vote recorded"}
         except Exception as contract_error:
             logger.error(f"Contract error when submitting vote: {contract_error}")
             logger.error(traceback.format_exc())
             # For development, simulate success
-            return {"transaction_hash": "0x" + "0" * 64, "message": "Vote simulated (contract error occurred)"}
+            return {"transaction_hash": SIMULATED_TX_HASH, "message": "Vote simulated (contract error occurred)"}
     except Exception as e:
         logger.error(f"Error submitting vote: {e}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to submit vote: {str(e)}")
 
+def record_vote_submission(voter_id: str, tx_hash: str, shard_id: str):
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO vote_submissions (shard, voter_id, tx_hash, submitted_at) VALUES (%s, %s, %s, NOW())",
+            (shard_id, voter_id, tx_hash)
+        )
+        connection.commit()
+    except Exception as e:
+        # Don't fail the vote just because we couldn't record it for auditing
+        logger.error(f"Failed to record vote submission: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
 @app.post("/candidates", status_code=status.HTTP_201_CREATED)
-async def add_candidate(candidate: CandidateCreate, auth_data: dict = Depends(require_admin)):
-    settings = get_settings()
+async def add_candidate(
+    candidate: CandidateCreate,
+    shard: Optional[str] = None,
+    auth_data: dict = Depends(require_admin),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    shard = get_shard(shard)
+    return await run_idempotent(
+        idempotency_key, auth_data, "/candidates", {**candidate.dict(), "shard": shard.shard_id}, status.HTTP_201_CREATED,
+        lambda: _add_candidate(candidate, auth_data, shard)
+    )
+
+async def _add_candidate(candidate: CandidateCreate, auth_data: dict, shard: Shard):
     w3 = get_web3()
     try:
-        logger.info(f"Adding candidate: {candidate.name} ({candidate.party}) by admin: {auth_data['voter_id']}")
+        logger.info(f"Adding candidate: {candidate.name} ({candidate.party}) to shard {shard.shard_id} by admin: {auth_data['voter_id']}")
         
-        voting_contract = get_voting_contract()
+        voting_contract = get_voting_contract(shard.shard_id)
         try:
-            tx = voting_contract.functions.addCandidate(candidate.name, candidate.party).build_transaction({
-                'from': settings.OWNER_ADDRESS,
-                'nonce': w3.eth.get_transaction_count(settings.OWNER_ADDRESS),
-                'gas': 200000,
-                'gasPrice': w3.eth.gas_price
-            })
-            signed_tx = w3.eth.account.sign_transaction(tx, settings.OWNER_PRIVATE_KEY)
-            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = send_owner_transaction(
+                w3, shard.owner_address, shard.owner_private_key,
+                voting_contract.functions.addCandidate(candidate.name, candidate.party)
+            )
             
             logger.info(f"Candidate {candidate.name} added successfully, tx_hash: {tx_hash.hex()}")
             return {"transaction_hash": tx_hash.hex(), "message": "Candidate added"}
@@ -645,31 +1780,113 @@ async def add_candidate(candidate: CandidateCreate, auth_data: dict = Depends(re
             logger.error(f"Contract error when adding candidate: {contract_error}")
             logger.error(traceback.format_exc())
             # For development, simulate success
-            return {"transaction_hash": "0x" + "0" * 64, "message": "Candidate addition simulated (contract error occurred)"}
+            return {"transaction_hash": SIMULATED_TX_HASH, "message": "Candidate addition simulated (contract error occurred)"}
     except Exception as e:
         logger.error(f"Error adding candidate: {e}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to add candidate: {str(e)}")
 
-@app.post("/voting/set-dates", status_code=status.HTTP_200_OK)
-async def set_voting_dates(dates: VotingDates, auth_data: dict = Depends(require_admin)):
+def run_candidate_import(job_id: int, shard_id: str):
     settings = get_settings()
+    shard = get_shard(shard_id)
+    w3 = get_web3()
+    nonces = get_nonce_manager(shard.owner_address)
+    try:
+        # The import holds its connection through every receipt wait, so keep it out of the pool
+        progress = bulk_candidates.run_job(
+            get_direct_db_connection, w3, get_voting_contract(shard.shard_id),
+            shard.owner_address, shard.owner_private_key, job_id,
+            max_in_flight=settings.BULK_MAX_IN_FLIGHT,
+            receipt_timeout=settings.BULK_RECEIPT_TIMEOUT_SECONDS,
+            reserve_nonces=lambda count: nonces.reserve(w3, count)
+        )
+        if progress["status"] != "completed":
+            # Rows that failed to broadcast leave gaps in the reserved nonce range
+            nonces.reset()
+        logger.info(f"Candidate import job {job_id} {progress['status']}: {progress['counts']}")
+    except Exception as e:
+        nonces.reset()
+        logger.error(f"Candidate import job {job_id} failed: {e}")
+        logger.error(traceback.format_exc())
+
+@app.post("/candidates/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def add_candidates_bulk(
+    bulk: BulkCandidateCreate,
+    background_tasks: BackgroundTasks,
+    shard: Optional[str] = None,
+    auth_data: dict = Depends(require_admin),
+    db=Depends(get_db_cursor)
+):
+    cursor, conn = db
+    shard_id = get_shard(shard).shard_id
+    try:
+        candidates = [(c.name, c.party) for c in bulk.candidates]
+        job_id = bulk_candidates.create_job(conn, auth_data["voter_id"], candidates, shard=shard_id)
+        bulk_candidates.claim_job(conn, job_id)
+        logger.info(f"Candidate import job {job_id} created with {len(candidates)} candidates for shard {shard_id} by admin: {auth_data['voter_id']}")
+    except Error as e:
+        logger.error(f"Database error creating candidate import job: {e}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Failed to create import job: {str(e)}")
+    
+    background_tasks.add_task(run_candidate_import, job_id, shard_id)
+    return {"job_id": job_id, "shard": shard_id, "total": len(candidates), "message": "Candidate import started"}
+
+@app.get("/candidates/bulk/{job_id}", status_code=status.HTTP_200_OK)
+async def get_candidate_import(job_id: int, rows: bool = False, auth_data: dict = Depends(require_admin), db=Depends(get_db_cursor)):
+    cursor, conn = db
+    progress = bulk_candidates.job_progress(conn, job_id, include_rows=rows)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return progress
+
+@app.post("/candidates/bulk/{job_id}/resume", status_code=status.HTTP_202_ACCEPTED)
+async def resume_candidate_import(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    auth_data: dict = Depends(require_admin),
+    db=Depends(get_db_cursor)
+):
+    cursor, conn = db
+    progress = bulk_candidates.job_progress(conn, job_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if progress["status"] == "completed":
+        return {"job_id": job_id, "message": "Import job already completed"}
+    # Conditional update, so two concurrent resumes cannot both start; a run abandoned by a dead process can be taken over
+    if not bulk_candidates.claim_job(conn, job_id, get_settings().BULK_JOB_STALE_SECONDS):
+        raise HTTPException(status_code=409, detail="Import job is already running")
+    
+    logger.info(f"Resuming candidate import job {job_id} by admin: {auth_data['voter_id']}")
+    background_tasks.add_task(run_candidate_import, job_id, progress["shard"])
+    return {"job_id": job_id, "message": "Candidate import resumed"}
+
+@app.post("/voting/set-dates", status_code=status.HTTP_200_OK)
+async def set_voting_dates(
+    dates: VotingDates,
+    shard: Optional[str] = None,
+    auth_data: dict = Depends(require_admin),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    shard = get_shard(shard)
+    return await run_idempotent(
+        idempotency_key, auth_data, "/voting/set-dates", {**dates.dict(), "shard": shard.shard_id}, status.HTTP_200_OK,
+        lambda: _set_voting_dates(dates, auth_data, shard)
+    )
+
+async def _set_voting_dates(dates: VotingDates, auth_data: dict, shard: Shard):
     w3 = get_web3()
     try:
         start_date_str = datetime.fromtimestamp(dates.start_date).isoformat()
         end_date_str = datetime.fromtimestamp(dates.end_date).isoformat()
-        logger.info(f"Setting voting dates: {start_date_str} to {end_date_str} by admin: {auth_data['voter_id']}")
+        logger.info(f"Setting voting dates for shard {shard.shard_id}: {start_date_str} to {end_date_str} by admin: {auth_data['voter_id']}")
         
-        voting_contract = get_voting_contract()
+        voting_contract = get_voting_contract(shard.shard_id)
         try:
-            tx = voting_contract.functions.setVotingPeriod(dates.start_date, dates.end_date).build_transaction({
-                'from': settings.OWNER_ADDRESS,
-                'nonce': w3.eth.get_transaction_count(settings.OWNER_ADDRESS),
-                'gas': 200000,
-                'gasPrice': w3.eth.gas_price
-            })
-            signed_tx = w3.eth.account.sign_transaction(tx, settings.OWNER_PRIVATE_KEY)
-            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = send_owner_transaction(
+                w3, shard.owner_address, shard.owner_private_key,
+                voting_contract.functions.setVotingPeriod(dates.start_date, dates.end_date)
+            )
             
             logger.info(f"Voting dates set successfully, tx_hash: {tx_hash.hex()}")
             return {"transaction_hash": tx_hash.hex(), "message": "Voting dates set"}
@@ -677,31 +1894,38 @@ async def set_voting_dates(dates: VotingDates, auth_data: dict = Depends(require
             logger.error(f"Contract error when setting voting dates: {contract_error}")
             logger.error(traceback.format_exc())
             # For development, simulate success
-            return {"transaction_hash": "0x" + "0" * 64, "message": "Voting dates setting simulated (contract error occurred)"}
+            return {"transaction_hash": SIMULATED_TX_HASH, "message": "Voting dates setting simulated (contract error occurred)"}
     except Exception as e:
         logger.error(f"Error setting voting dates: {e}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to set voting dates: {str(e)}")
 
 @app.post("/voting/update-dates", status_code=status.HTTP_200_OK)
-async def update_voting_dates(dates: VotingDates, auth_data: dict = Depends(require_admin)):
-    settings = get_settings()
+async def update_voting_dates(
+    dates: VotingDates,
+    shard: Optional[str] = None,
+    auth_data: dict = Depends(require_admin),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    shard = get_shard(shard)
+    return await run_idempotent(
+        idempotency_key, auth_data, "/voting/update-dates", {**dates.dict(), "shard": shard.shard_id}, status.HTTP_200_OK,
+        lambda: _update_voting_dates(dates, auth_data, shard)
+    )
+
+async def _update_voting_dates(dates: VotingDates, auth_data: dict, shard: Shard):
     w3 = get_web3()
     try:
         start_date_str = datetime.fromtimestamp(dates.start_date).isoformat()
         end_date_str = datetime.fromtimestamp(dates.end_date).isoformat()
-        logger.info(f"Updating voting dates: {start_date_str} to {end_date_str} by admin: {auth_data['voter_id']}")
+        logger.info(f"Updating voting dates for shard {shard.shard_id}: {start_date_str} to {end_date_str} by admin: {auth_data['voter_id']}")
         
-        voting_contract = get_voting_contract()
+        voting_contract = get_voting_contract(shard.shard_id)
         try:
-            tx = voting_contract.functions.setVotingPeriod(dates.start_date, dates.end_date).build_transaction({
-                'from': settings.OWNER_ADDRESS,
-                'nonce': w3.eth.get_transaction_count(settings.OWNER_ADDRESS),
-                'gas': 200000,
-                'gasPrice': w3.eth.gas_price
-            })
-            signed_tx = w3.eth.account.sign_transaction(tx, settings.OWNER_PRIVATE_KEY)
-            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = send_owner_transaction(
+                w3, shard.owner_address, shard.owner_private_key,
+                voting_contract.functions.setVotingPeriod(dates.start_date, dates.end_date)
+            )
             
             logger.info(f"Voting dates updated successfully, tx_hash: {tx_hash.hex()}")
             return {"transaction_hash": tx_hash.hex(), "message": "Voting dates updated"}
@@ -709,12 +1933,57 @@ async def update_voting_dates(dates: VotingDates, auth_data: dict = Depends(requ
             logger.error(f"Contract error when updating voting dates: {contract_error}")
             logger.error(traceback.format_exc())
             # For development, simulate success
-            return {"transaction_hash": "0x" + "0" * 64, "message": "Voting dates updating simulated (contract error occurred)"}
+            return {"transaction_hash": SIMULATED_TX_HASH, "message": "Voting dates updating simulated (contract error occurred)"}
     except Exception as e:
         logger.error(f"Error updating voting dates: {e}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to update voting dates: {str(e)}")
 
+@app.get("/admin/export/{table}")
+async def export_audit_table(
+    table: str,
+    format: str = "csv",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    voter_id: Optional[str] = None,
+    shard: Optional[str] = None,
+    gzip: bool = False,
+    auth_data: dict = Depends(require_admin)
+):
+    """Stream a full audit export of login_history or vote_submissions"""
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export table: {table}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if voter_id:
+        if not Web3.is_address(voter_id):
+            raise HTTPException(status_code=400, detail="Invalid Ethereum address format")
+        voter_id = Web3.to_checksum_address(voter_id)
+    if shard and "shard" not in EXPORT_TABLES[table]["columns"]:
+        raise HTTPException(status_code=400, detail=f"Table {table} cannot be filtered by shard")
+    
+    logger.info(f"Audit export of {table} ({format}) requested by admin: {auth_data['voter_id']}")
+    
+    def stream():
+        # Opened only once streaming starts, and closed when the client disconnects (GeneratorExit)
+        connection = get_direct_db_connection()
+        try:
+            yield from iter_export(connection, table, format, since, until, voter_id, compress=gzip, shard=shard)
+        except Exception as e:
+            logger.error(f"Audit export of {table} failed: {e}")
+            logger.error(traceback.format_exc())
+            raise
+        finally:
+            connection.close()
+    
+    filename = f"{table}.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else ("text/csv" if format == "csv" else "application/x-ndjson")
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(auth_data: dict = Depends(authenticate), db=Depends(get_db_cursor)):
     cursor, conn = db
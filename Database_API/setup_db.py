@@ -22,6 +22,24 @@ def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
+def ensure_index(cursor, table: str, index_name: str, columns: str):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.statistics WHERE table_schema = %s AND table_name = %s AND index_name = %s LIMIT 1",
+        (DB_NAME, table, index_name)
+    )
+    if not cursor.fetchone():
+        cursor.execute(f"CREATE INDEX {index_name} ON {table} ({columns})")
+        print(f"Index '{index_name}' created on '{table}'")
+
+def ensure_column(cursor, table: str, column: str, definition: str):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns WHERE table_schema = %s AND table_name = %s AND column_name = %s LIMIT 1",
+        (DB_NAME, table, column)
+    )
+    if not cursor.fetchone():
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        print(f"Column '{column}' added to '{table}'")
+
 def setup_database():
     # Connect to MySQL
     conn = mysql.connector.connect(**DB_CONFIG)
@@ -40,11 +58,15 @@ def setup_database():
         voter_id VARCHAR(42) PRIMARY KEY,
         password_hash VARCHAR(100) NOT NULL,
         role ENUM('voter', 'admin') DEFAULT 'voter',
+        shard VARCHAR(64) NOT NULL DEFAULT 'default',
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP
     )
     """)
     print("Table 'voters' created or already exists")
     
+    # Each voter belongs to one election shard; voters registered before sharding get the default shard
+    ensure_column(cursor, "voters", "shard", "VARCHAR(64) NOT NULL DEFAULT 'default' AFTER role")
+    
     # Create login_history table if it doesn't exist
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS login_history (
@@ -56,6 +78,118 @@ def setup_database():
     """)
     print("Table 'login_history' created or already exists")
     
+    # Indexes used by the audit export (time range and per-voter keyset paging)
+    ensure_index(cursor, "login_history", "idx_login_history_time", "login_time, id")
+    ensure_index(cursor, "login_history", "idx_login_history_voter", "voter_id, login_time, id")
+    
+    # Create vote_submissions table if it doesn't exist
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS vote_submissions (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        shard VARCHAR(64) NOT NULL DEFAULT 'default',
+        voter_id VARCHAR(42) NOT NULL,
+        tx_hash VARCHAR(66) NOT NULL,
+        submitted_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_vote_submissions_time (submitted_at, id),
+        INDEX idx_vote_submissions_voter (voter_id, submitted_at, id)
+    )
+    """)
+    print("Table 'vote_submissions' created or already exists")
+    
+    # Databases created before sharding lack the shard column; existing rows belong to the default shard
+    ensure_column(cursor, "vote_submissions", "shard", "VARCHAR(64) NOT NULL DEFAULT 'default' AFTER id")
+    ensure_index(cursor, "vote_submissions", "idx_vote_submissions_shard", "shard, submitted_at, id")
+    
+    # Create idempotency_keys table if it doesn't exist
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        idempotency_key VARCHAR(255) NOT NULL,
+        voter_id VARCHAR(42) NOT NULL,
+        endpoint VARCHAR(64) NOT NULL,
+        request_hash CHAR(64) NOT NULL,
+        status ENUM('pending', 'completed') DEFAULT 'pending',
+        response_code SMALLINT NULL,
+        response_body TEXT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        expires_at DATETIME NOT NULL,
+        PRIMARY KEY (voter_id, endpoint, idempotency_key),
+        INDEX idx_idempotency_expires (expires_at)
+    )
+    """)
+    print("Table 'idempotency_keys' created or already exists")
+    
+    # Create indexer_checkpoints table if it doesn't exist
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS indexer_checkpoints (
+        name VARCHAR(64) PRIMARY KEY,
+        block_number BIGINT NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """)
+    print("Table 'indexer_checkpoints' created or already exists")
+    
+    # Create voted_addresses table if it doesn't exist
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS voted_addresses (
+        shard VARCHAR(64) NOT NULL DEFAULT 'default',
+        address BINARY(20) NOT NULL,
+        block_number BIGINT NOT NULL,
+        PRIMARY KEY (shard, address)
+    )
+    """)
+    print("Table 'voted_addresses' created or already exists")
+    
+    # Create tally snapshot tables if they don't exist
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS tally_snapshots (
+        shard VARCHAR(64) NOT NULL DEFAULT 'default',
+        block_number BIGINT NOT NULL,
+        block_timestamp BIGINT NOT NULL,
+        total_votes BIGINT NOT NULL,
+        PRIMARY KEY (shard, block_number),
+        INDEX idx_tally_snapshots_time (shard, block_timestamp)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS tally_snapshot_counts (
+        shard VARCHAR(64) NOT NULL DEFAULT 'default',
+        block_number BIGINT NOT NULL,
+        candidate_id INT NOT NULL,
+        vote_count BIGINT NOT NULL,
+        PRIMARY KEY (shard, block_number, candidate_id)
+    )
+    """)
+    print("Tables 'tally_snapshots' and 'tally_snapshot_counts' created or already exist")
+    
+    # Create bulk candidate import tables if they don't exist
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS candidate_import_jobs (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        shard VARCHAR(64) NOT NULL DEFAULT 'default',
+        created_by VARCHAR(42) NOT NULL,
+        status ENUM('pending', 'running', 'completed', 'incomplete') DEFAULT 'pending',
+        total INT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS candidate_import_rows (
+        job_id INT NOT NULL,
+        row_index INT NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        party VARCHAR(255) NOT NULL,
+        nonce BIGINT NULL,
+        tx_hash VARCHAR(66) NULL,
+        status ENUM('pending', 'signed', 'sent', 'mined', 'failed') DEFAULT 'pending',
+        block_number BIGINT NULL,
+        error TEXT NULL,
+        PRIMARY KEY (job_id, row_index),
+        INDEX idx_candidate_import_status (job_id, status)
+    )
+    """)
+    print("Tables 'candidate_import_jobs' and 'candidate_import_rows' created or already exist")
+    
     # Insert admin user if it doesn't exist
     admin_address = "0x577a71aeae2C21d56b0c99D1e7c568fCC2391587"
     admin_password = "ADMIN123"
@@ -0,0 +1,43 @@
+# shard_config.py
+"""Parsing of the VOTING_SHARDS setting, shared by the API and the CLI tools.
+
+VOTING_SHARDS is a JSON object of shard id -> contract address, or
+shard id -> {"contract_address", "owner_address", "owner_private_key"}.
+Without it there is a single shard named default_shard bound to the
+fallback contract address.
+"""
+import json
+
+def parse_voting_shards(voting_shards: str, default_shard: str, contract_address: str,
+                        owner_address: str, owner_private_key: str) -> dict:
+    """Return {shard_id: {"contract_address", "owner_address", "owner_private_key"}}."""
+    if not voting_shards:
+        return {default_shard: {
+            "contract_address": contract_address,
+            "owner_address": owner_address,
+            "owner_private_key": owner_private_key
+        }}
+
+    shards = {}
+    for shard_id, config in json.loads(voting_shards).items():
+        if isinstance(config, str):
+            config = {"contract_address": config}
+        shards[shard_id] = {
+            "contract_address": config["contract_address"],
+            "owner_address": config.get("owner_address", owner_address),
+            "owner_private_key": config.get("owner_private_key", owner_private_key)
+        }
+    return shards
+
+def resolve_shard_id(shards: dict, shard_id: str, default_shard: str):
+    """Map a requested shard id to a configured one, or None if it is unknown.
+
+    The default shard falls back to the first configured shard when
+    VOTING_SHARDS has no entry for it.
+    """
+    shard_id = shard_id or default_shard
+    if shard_id in shards:
+        return shard_id
+    if shard_id == default_shard and shards:
+        return next(iter(shards))
+    return None
@@ -0,0 +1,223 @@
+# tracing.py
+"""Lightweight request tracing.
+
+Each sampled request gets a trace; spans opened with ``span()`` while it is
+running are attached to it through context variables, so nothing has to be
+passed around. Traces slower than the configured threshold are written as
+OTLP/JSON lines to a rotating file and summarised in the slow-request log.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+_export_logger = logging.getLogger("tracing.export")
+_export_logger.propagate = False
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+_config = {"sample_rate": 0.0, "slow_ms": 500.0, "service_name": "voting-api"}
+
+# W3C trace context: version-traceid-parentid-flags, all lowercase hex
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+def configure(sample_rate: float, slow_ms: float, export_path: str, max_bytes: int, backup_count: int,
+              service_name: str = "voting-api"):
+    _config.update(sample_rate=sample_rate, slow_ms=slow_ms, service_name=service_name)
+    for handler in list(_export_logger.handlers):
+        _export_logger.removeHandler(handler)
+        handler.close()
+    if export_path:
+        handler = RotatingFileHandler(export_path, maxBytes=max_bytes, backupCount=backup_count)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _export_logger.addHandler(handler)
+        _export_logger.setLevel(logging.INFO)
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, parent_id, attributes: dict):
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+class Trace:
+    def __init__(self, trace_id: str = None, parent_span_id: str = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        # Span id of the caller's span when the trace was continued from a traceparent header
+        self.parent_span_id = parent_span_id
+        self.spans = []
+
+def parse_traceparent(header: str):
+    """Return (trace_id, parent_span_id) from a W3C traceparent header, or (None, None) if it is invalid."""
+    match = _TRACEPARENT_RE.match(header.strip()) if header else None
+    if not match:
+        return None, None
+    version, trace_id, parent_id, _ = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None, None
+    return trace_id, parent_id
+
+def current_trace_id():
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+def start_trace(traceparent: str = None):
+    """Start a trace for the current request if it is sampled. Returns (trace, token) or (None, None).
+
+    A valid traceparent header continues the caller's trace; an invalid one is ignored.
+    """
+    if _config["sample_rate"] <= 0 or random.random() >= _config["sample_rate"]:
+        return None, None
+    trace = Trace(*parse_traceparent(traceparent))
+    return trace, _current_trace.set(trace)
+
+def end_trace(trace: "Trace", token):
+    _current_trace.reset(token)
+    root = trace.spans[0] if trace.spans else None
+    if root is None or root.duration_ms < _config["slow_ms"]:
+        return
+    _log_slow_trace(trace)
+    if _export_logger.handlers:
+        _export_logger.info(json.dumps(_to_otlp(trace)))
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span. A no-op outside a sampled trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else trace.parent_span_id, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+def traced(name: str):
+    """Decorator form of span() for synchronous functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def rpc_tracing_middleware(make_request, w3):
+    """web3 middleware that opens a span around every JSON-RPC request."""
+    def middleware(method, params):
+        with span(f"rpc {method}", **{"rpc.method": method}):
+            return make_request(method, params)
+    return middleware
+
+class TracedCursor:
+    """Cursor proxy that opens a span around every query."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        with span("mysql.query", **{"db.statement": " ".join(str(operation).split())[:300]}):
+            return self._cursor.execute(operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        with span("mysql.executemany", **{"db.statement": " ".join(str(operation).split())[:300]}):
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class TracedConnection:
+    """Connection proxy whose cursors are traced."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return TracedCursor(self._connection.cursor(*args, **kwargs))
+
+    def commit(self):
+        with span("mysql.commit"):
+            return self._connection.commit()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _to_otlp(trace: "Trace") -> dict:
+    spans = []
+    root = trace.spans[0] if trace.spans else None
+    for s in trace.spans:
+        item = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 2 if s is root else 1,  # SERVER for the request, INTERNAL otherwise
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or time.time_ns()),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": _config["service_name"]}}]},
+            "scopeSpans": [{"scope": {"name": "voting-api.tracing"}, "spans": spans}]
+        }]
+    }
+
+def _log_slow_trace(trace: "Trace"):
+    children = {}
+    for s in trace.spans:
+        children.setdefault(s.parent_id, []).append(s)
+
+    lines = []
+    def walk(parent_id, depth):
+        for s in children.get(parent_id, []):
+            child_ms = sum(c.duration_ms for c in children.get(s.span_id, []))
+            lines.append(
+                f"{'  ' * depth}{s.name}: {s.duration_ms:.1f}ms (self {max(0.0, s.duration_ms - child_ms):.1f}ms)"
+                + (f" ERROR {s.error}" if s.error else "")
+            )
+            walk(s.span_id, depth + 1)
+    walk(trace.parent_span_id, 0)
+    root = trace.spans[0]
+    logger.warning(f"Slow request {root.name} took {root.duration_ms:.1f}ms (trace {trace.trace_id}):\n" + "\n".join(lines))
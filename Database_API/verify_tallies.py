@@ -0,0 +1,306 @@
+# verify_tallies.py
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import mysql.connector
+from dotenv import load_dotenv
+from web3 import Web3
+
+# Load environment variables
+load_dotenv()
+
+ETHER_RPC_URL = os.getenv("ETHER_RPC_URL", "http://127.0.0.1:7545")
+VOTING_CONTRACT_ADDRESS = os.getenv("VOTING_CONTRACT_ADDRESS", "0xd223C26a57c51364Cbb8728984EE22744fAe7840")
+# First block the API's voted_addresses indexer scans (only used with --compare-db)
+VOTED_INDEX_START_BLOCK = int(os.getenv("VOTED_INDEX_START_BLOCK", "0"))
+
+# Database configuration (only used with --compare-db)
+DB_CONFIG = {
+    'user': os.getenv("MYSQL_USER", "root"),
+    'password': os.getenv("MYSQL_PASSWORD", "014514774"),
+    'host': os.getenv("MYSQL_HOST", "localhost"),
+    'database': os.getenv("MYSQL_DB", "voter_db"),
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VOTING_JSON_PATH = os.path.join(BASE_DIR, "..", "build", "contracts", "Voting.json")
+
+VOTE_CAST_TOPIC = Web3.to_hex(Web3.keccak(text="VoteCast(uint256,uint256)"))
+CANDIDATE_ADDED_TOPIC = Web3.to_hex(Web3.keccak(text="CandidateAdded(uint256,string,string)"))
+
+# Substrings nodes use when a getLogs range returns too many results
+LIMIT_ERROR_MARKERS = ("limit", "too many", "exceed", "response size", "query returned more than", "-32005")
+
+class ReplayState:
+    """Tallies rebuilt from logs. Merging is order-independent so chunks can be folded in as they finish."""
+
+    def __init__(self):
+        self.tallies = Counter()
+        self.max_vote_count = {}
+        self.candidates = {}
+        self.logs = 0
+
+    def merge(self, other: "ReplayState"):
+        self.tallies.update(other.tallies)
+        for candidate_id, count in other.max_vote_count.items():
+            self.max_vote_count[candidate_id] = max(self.max_vote_count.get(candidate_id, 0), count)
+        self.candidates.update(other.candidates)
+        self.logs += other.logs
+
+    def to_dict(self) -> dict:
+        return {
+            "tallies": {str(k): v for k, v in self.tallies.items()},
+            "max_vote_count": {str(k): v for k, v in self.max_vote_count.items()},
+            "candidates": {str(k): v for k, v in self.candidates.items()},
+            "logs": self.logs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReplayState":
+        state = cls()
+        state.tallies = Counter({int(k): v for k, v in data.get("tallies", {}).items()})
+        state.max_vote_count = {int(k): v for k, v in data.get("max_vote_count", {}).items()}
+        state.candidates = {int(k): v for k, v in data.get("candidates", {}).items()}
+        state.logs = data.get("logs", 0)
+        return state
+
+def is_limit_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in LIMIT_ERROR_MARKERS)
+
+def fold_logs(contract, logs) -> ReplayState:
+    state = ReplayState()
+    for log in logs:
+        topic = Web3.to_hex(log["topics"][0])
+        candidate_id = int.from_bytes(bytes(log["topics"][1]), "big")
+        if topic == VOTE_CAST_TOPIC:
+            # VoteCast data is the single uint256 newVoteCount; decode by hand for speed
+            new_count = int.from_bytes(bytes(log["data"])[-32:], "big")
+            state.tallies[candidate_id] += 1
+            state.max_vote_count[candidate_id] = max(state.max_vote_count.get(candidate_id, 0), new_count)
+        elif topic == CANDIDATE_ADDED_TOPIC:
+            event = contract.events.CandidateAdded().process_log(log)
+            state.candidates[candidate_id] = {"name": event["args"]["name"], "party": event["args"]["party"]}
+        state.logs += 1
+    return state
+
+def fetch_range(w3, contract, from_block: int, to_block: int) -> ReplayState:
+    logs = w3.eth.get_logs({
+        "address": contract.address,
+        "fromBlock": from_block,
+        "toBlock": to_block,
+        "topics": [[VOTE_CAST_TOPIC, CANDIDATE_ADDED_TOPIC]]
+    })
+    return fold_logs(contract, logs)
+
+def replay(w3, contract, from_block: int, to_block: int, chunk_size: int, workers: int, stats: dict) -> ReplayState:
+    """Fetch logs in parallel chunks, halving the chunk size whenever the node rejects a range as too large."""
+    state = ReplayState()
+    max_chunk = chunk_size
+    successes = 0
+    next_block = from_block
+    retries = deque()
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while next_block <= to_block or retries or in_flight:
+            while len(in_flight) < workers and (retries or next_block <= to_block):
+                if retries:
+                    start, end = retries.popleft()
+                else:
+                    start, end = next_block, min(to_block, next_block + chunk_size - 1)
+                    next_block = end + 1
+                in_flight[pool.submit(fetch_range, w3, contract, start, end)] = (start, end)
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = in_flight.pop(future)
+                try:
+                    state.merge(future.result())
+                    stats["requests"] += 1
+                    successes += 1
+                    # Creep back up once the node has accepted a run of ranges at this size
+                    if successes >= workers * 2:
+                        chunk_size = min(max_chunk, chunk_size + max(1, chunk_size // 4))
+                        successes = 0
+                except Exception as e:
+                    if not is_limit_error(e) or start == end:
+                        raise
+                    stats["splits"] += 1
+                    successes = 0
+                    middle = (start + end) // 2
+                    retries.extendleft([(middle + 1, end), (start, middle)])
+                    chunk_size = max(1, min(chunk_size, (end - start + 1) // 2))
+    stats["final_chunk_size"] = chunk_size
+    return state
+
+def load_checkpoint(path: str, contract_address: str):
+    """Return (first_block, last_block, state) from a checkpoint, or (None, None, empty state)."""
+    if not path or not os.path.exists(path):
+        return None, None, ReplayState()
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("contract_address", "").lower() != contract_address.lower():
+        raise SystemExit(f"Checkpoint {path} belongs to contract {data.get('contract_address')}, not {contract_address}")
+    return data.get("first_block"), data["last_block"], ReplayState.from_dict(data["state"])
+
+def save_checkpoint(path: str, contract_address: str, first_block: int, last_block: int, state: ReplayState):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "contract_address": contract_address,
+            "first_block": first_block,
+            "last_block": last_block,
+            "state": state.to_dict()
+        }, f)
+    os.replace(tmp_path, path)
+
+def compare(contract, state: ReplayState, first_block: int, to_block: int, compare_db: bool,
+            shard: str = "default", index_start_block: int = VOTED_INDEX_START_BLOCK):
+    """Return (problems, notes). Notes explain comparisons that were skipped rather than failed."""
+    problems = []
+    notes = []
+    on_chain = contract.functions.getAllCandidates().call(block_identifier=to_block)
+    on_chain_ids = set()
+    for candidate_id, name, party, vote_count in on_chain:
+        on_chain_ids.add(candidate_id)
+        replayed = state.tallies.get(candidate_id, 0)
+        if replayed != vote_count:
+            problems.append(f"Candidate {candidate_id} ({name}): chain reports {vote_count} votes, replay counted {replayed}")
+        if state.max_vote_count.get(candidate_id, 0) != replayed:
+            problems.append(
+                f"Candidate {candidate_id} ({name}): highest VoteCast newVoteCount is "
+                f"{state.max_vote_count.get(candidate_id, 0)}, replay counted {replayed}"
+            )
+        if candidate_id not in state.candidates:
+            problems.append(f"Candidate {candidate_id} ({name}) has no CandidateAdded event in the scanned range")
+    for candidate_id in set(state.tallies) - on_chain_ids:
+        problems.append(f"Votes replayed for unknown candidate {candidate_id}")
+
+    if compare_db:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT block_number FROM indexer_checkpoints WHERE name = %s",
+                (f"voted_addresses:{shard}",)
+            )
+            row = cursor.fetchone()
+            indexed_to = row[0] if row else None
+            indexed = None
+            if indexed_to is not None and indexed_to >= to_block and index_start_block <= first_block:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM voted_addresses WHERE shard = %s AND block_number BETWEEN %s AND %s",
+                    (shard, first_block, to_block)
+                )
+                (indexed,) = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+        # An index that is behind or starts later is lag, not a disagreement
+        if indexed_to is None or indexed_to < to_block:
+            notes.append(
+                f"voted_addresses index for shard {shard} has only reached block {indexed_to}, "
+                f"{'not started' if indexed_to is None else f'{to_block - indexed_to} blocks'} behind {to_block}; "
+                "database comparison skipped (rerun with --to-block at or below the index checkpoint)"
+            )
+        elif index_start_block > first_block:
+            notes.append(
+                f"voted_addresses index starts at block {index_start_block}, after the replay start {first_block}; "
+                "database comparison skipped"
+            )
+        else:
+            replayed_total = sum(state.tallies.values())
+            if indexed != replayed_total:
+                problems.append(f"Local voted_addresses index holds {indexed} voters, replay counted {replayed_total} votes")
+    return problems, notes
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild candidate tallies from contract logs and verify them against the chain")
+    parser.add_argument("--rpc-url", default=ETHER_RPC_URL)
+    parser.add_argument("--contract", default=VOTING_CONTRACT_ADDRESS)
+    parser.add_argument("--from-block", type=int, default=0)
+    parser.add_argument("--to-block", type=int, help="Last block to replay (defaults to the current head)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Initial blocks per eth_getLogs request")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent eth_getLogs requests")
+    parser.add_argument("--window", type=int, default=100000, help="Blocks replayed between checkpoint writes")
+    parser.add_argument("--checkpoint", help="Checkpoint file; reruns only replay blocks after it")
+    parser.add_argument("--compare-db", action="store_true", help="Also compare with the API's voted_addresses index")
+    parser.add_argument("--shard", default="default", help="Shard id of the contract in the API's local index")
+    parser.add_argument("--index-start-block", type=int, default=VOTED_INDEX_START_BLOCK,
+                        help="VOTED_INDEX_START_BLOCK the API's indexer was started with")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(args.rpc_url))
+    if not w3.is_connected():
+        raise SystemExit(f"Failed to connect to Ethereum node at {args.rpc_url}")
+    with open(VOTING_JSON_PATH, "r") as f:
+        abi = json.load(f)["abi"]
+    contract = w3.eth.contract(address=Web3.to_checksum_address(args.contract), abi=abi)
+
+    to_block = args.to_block if args.to_block is not None else w3.eth.block_number
+    first_block, last_block, state = load_checkpoint(args.checkpoint, contract.address)
+    if last_block is not None and last_block > to_block:
+        # The checkpointed tallies already include blocks after to_block and cannot be rolled back
+        raise SystemExit(
+            f"Checkpoint {args.checkpoint} is at block {last_block}, past --to-block {to_block}; "
+            "use a different checkpoint file or none to verify an earlier block"
+        )
+    from_block = args.from_block if last_block is None else last_block + 1
+    if first_block is None:
+        # Checkpoints written before first_block was recorded are assumed to share --from-block
+        first_block = args.from_block
+
+    stats = {"requests": 0, "splits": 0, "final_chunk_size": args.chunk_size}
+    started = time.perf_counter()
+    window_start = from_block
+    while window_start <= to_block:
+        window_end = min(to_block, window_start + args.window - 1)
+        state.merge(replay(w3, contract, window_start, window_end, args.chunk_size, args.workers, stats))
+        if args.checkpoint:
+            save_checkpoint(args.checkpoint, contract.address, first_block, window_end, state)
+        print(f"Replayed blocks {window_start}-{window_end}: {state.logs} logs so far", file=sys.stderr)
+        window_start = window_end + 1
+    elapsed = time.perf_counter() - started
+
+    problems, notes = compare(contract, state, first_block, to_block, args.compare_db, args.shard, args.index_start_block)
+    blocks = max(0, to_block - from_block + 1)
+    report = {
+        "contract_address": contract.address,
+        "from_block": from_block,
+        "to_block": to_block,
+        "tallies": {str(k): v for k, v in sorted(state.tallies.items())},
+        "total_votes": sum(state.tallies.values()),
+        "problems": problems,
+        "notes": notes,
+        "benchmark": {
+            "blocks": blocks,
+            "logs": state.logs,
+            "seconds": round(elapsed, 3),
+            "blocks_per_second": round(blocks / elapsed, 1) if elapsed else None,
+            **stats
+        }
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for candidate_id, count in sorted(state.tallies.items()):
+            name = state.candidates.get(candidate_id, {}).get("name", "?")
+            print(f"Candidate {candidate_id} ({name}): {count} votes")
+        print(f"Replayed {blocks} blocks in {elapsed:.2f}s ({stats['requests']} requests, {stats['splits']} splits)")
+        for problem in problems:
+            print(f"MISMATCH: {problem}")
+        for note in notes:
+            print(f"NOTE: {note}")
+        print("Tallies verified" if not problems else f"{len(problems)} mismatches found")
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()